@@ -0,0 +1,109 @@
+"""Offline retrieval benchmark: MarkdownChunker vs the legacy fixed-width slicing.
+
+For every query in data/memo_queries.json the corpus is chunked both ways, chunks are ranked
+(BM25 by default, fastembed with --dense) and a hit is counted when a top-k chunk contains the
+whole answer span. Chunking throughput is reported as well.
+
+    python -m benchmarks.chunking_benchmark [--dense] [--k 3] [--size 800]
+"""
+import argparse
+import json
+import math
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from src.utils.chunker import MarkdownChunker, count_tokens
+from src.utils.utils import load_config
+
+DATA = Path(__file__).parent / "data"
+WORD = re.compile(r"\w+")
+
+def legacy_slices(text, size):
+    return [text[i:i+size] for i in range(0, len(text), size)]
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+class BM25:
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.docs = [Counter(WORD.findall(d.lower())) for d in docs]
+        self.lengths = [sum(d.values()) for d in self.docs]
+        self.avg = sum(self.lengths) / len(self.lengths)
+        df = Counter(t for d in self.docs for t in d)
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    def rank(self, query):
+        terms = WORD.findall(query.lower())
+        scores = []
+        for i, (doc, length) in enumerate(zip(self.docs, self.lengths)):
+            s = 0.0
+            for t in terms:
+                tf = doc.get(t, 0)
+                if tf: s += self.idf[t] * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / self.avg))
+            scores.append((s, i))
+        return [i for _, i in sorted(scores, reverse=True)]
+
+class Dense:
+    def __init__(self, docs):
+        import numpy as np
+        from fastembed import TextEmbedding
+        self.np = np
+        self.model = TextEmbedding()
+        self.vectors = np.array(list(self.model.embed(docs)))
+
+    def rank(self, query):
+        q = next(iter(self.model.query_embed(query)))
+        return list(self.np.argsort(-(self.vectors @ q)))
+
+def evaluate(name, chunks, queries, ranker_cls, k):
+    ranker = ranker_cls(chunks)
+    hits1 = hitsk = rr = 0.0
+    for q in queries:
+        answer = normalize(q["answer"])
+        ranked = ranker.rank(q["query"])
+        relevant = [pos for pos, i in enumerate(ranked) if answer in normalize(chunks[i])]
+        if relevant:
+            first = relevant[0]
+            hits1 += first == 0
+            hitsk += first < k
+            rr += 1 / (first + 1)
+    n = len(queries)
+    # Answers split across a chunk boundary can never be hit: that is what slicing costs
+    reachable = sum(any(normalize(q["answer"]) in normalize(c) for c in chunks) for q in queries)
+    tokens = [count_tokens(c) for c in chunks]
+    print(f"{name:<22} chunks={len(chunks):<4} avg_tokens={sum(tokens)/len(tokens):6.1f} "
+          f"reachable={reachable}/{n} hit@1={hits1/n:.2f} hit@{k}={hitsk/n:.2f} mrr={rr/n:.3f}")
+
+def throughput(name, fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat): fn(text)
+    elapsed = time.perf_counter() - start
+    mb = len(text.encode("utf-8")) * repeat / 1e6
+    print(f"{name:<22} {mb / elapsed:8.2f} MB/s ({repeat} passes, {elapsed*1000/repeat:.2f} ms/pass)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dense", action="store_true", help="rank with fastembed instead of BM25")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--size", type=int, default=800, help="legacy slice width in characters")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    text = (DATA / "memo.md").read_text()
+    queries = json.loads((DATA / "memo_queries.json").read_text())
+    chunker = MarkdownChunker(**load_config().get('chunking', {}))
+    ranker = Dense if args.dense else BM25
+
+    print(f"== Retrieval ({'dense' if args.dense else 'bm25'}, {len(queries)} queries)")
+    evaluate(f"slice[{args.size}]", legacy_slices(text, args.size), queries, ranker, args.k)
+    evaluate("markdown_chunker", [c.text for c in chunker.split(text)], queries, ranker, args.k)
+
+    print("== Chunking throughput")
+    throughput(f"slice[{args.size}]", lambda t: legacy_slices(t, args.size), text, args.repeat)
+    throughput("markdown_chunker", chunker.split, text, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Offline end-to-end load benchmark: /chat, /research and a full deep crawl against the FastAPI app.
+
+OpenAI, SerpApi, Qdrant, Redis and the target website are replaced by the local stand-ins in
+benchmarks/standins.py, so runs are deterministic and need no keys or network. Requests go
+through the real ASGI app (lifespan included) with httpx. Each pipeline runs in a fresh
+process and reports latency percentiles, throughput, peak RSS and where the time went
+(average ms per request for each traced stage).
+
+    pip install fakeredis
+    python -m benchmarks.e2e_benchmark [--pipelines chat research crawl] [--concurrency 16]
+        [--requests 64] [--llm-latency 0.2] [--search-latency 0.05] [--hash-embeddings]
+
+--hash-embeddings swaps fastembed for hashing embedders on machines without the models cached.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import resource
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+DATA = Path(__file__).parent / "data"
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values: return 0.0
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _stage_times(spans, totals):
+    totals[spans["name"]] += spans["ms"]
+    for child in spans.get("children", []): _stage_times(child, totals)
+
+async def _load(client, path, bodies, concurrency, total):
+    """`total` requests cycling through `bodies`, `concurrency` in flight at a time."""
+    latencies, stages, errors = [], defaultdict(float), 0
+    counter = iter(range(total))
+
+    async def user():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            resp = await client.post(path, json=bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code != 200:
+                errors += 1
+                continue
+            spans = resp.json().get("trace", {}).get("spans")
+            if spans: _stage_times(spans, stages)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "requests": total, "errors": errors, "wall_s": wall, "throughput": total / wall,
+        "p50_ms": percentile(latencies, 50) * 1000, "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "stages_ms": {k: v / total for k, v in sorted(stages.items(), key=lambda kv: -kv[1])},
+    }
+
+async def _crawl(client, base_url, timeout=600):
+    from src.jobs.worker import build_worker
+    from src.jobs.queue import TERMINAL
+    worker = asyncio.create_task(build_worker().run())
+    try:
+        crawl_id = (await client.post("/research", json={"url": base_url})).json()["tracking_id"]
+        start = time.perf_counter()
+        while time.perf_counter() - start < timeout:
+            job = (await client.get(f"/crawl/{crawl_id}")).json()
+            if job["status"] in TERMINAL: break
+            await asyncio.sleep(0.1)
+        wall = time.perf_counter() - start
+    finally:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+    progress = job["progress"]
+    return {"status": job["status"], "wall_s": wall, "pages_per_s": progress["pages_fetched"] / wall, **progress}
+
+async def _seed_knowledge(base_url):
+    """Chat recalls from Qdrant: index the benchmark memo the way a Phase 1 report is indexed."""
+    from src.memory.memory_manager import MemoryManager, REPORT_SOURCE
+    from src.utils.chunker import MarkdownChunker
+    pieces = MarkdownChunker().split((DATA / "memo.md").read_text())
+    metas = [{"source": REPORT_SOURCE, "heading": c.heading} for c in pieces]
+    await asyncio.to_thread(MemoryManager().save_knowledge, base_url, [c.text for c in pieces], metas)
+
+async def _run(pipeline, opts):
+    import httpx
+    from benchmarks.standins import serve_site, install
+    server, base_url = serve_site(opts["search_latency"])
+    install(f"{base_url}/search", opts["llm_latency"], opts["hash_embeddings"])
+    logging.getLogger("bowmen").setLevel(logging.WARNING)
+    import main  # after install(): module-level pipelines read the patched config
+
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                baseline = _peak_rss_mb()
+                if pipeline == "chat":
+                    await _seed_knowledge(base_url)
+                    queries = json.loads((DATA / "memo_queries.json").read_text())
+                    bodies = [{"url": base_url, "message": q["query"]} for q in queries]
+                    result = await _load(client, "/chat", bodies, opts["concurrency"], opts["requests"])
+                elif pipeline == "research":
+                    # Distinct company URLs: the same URL would be coalesced, then served from the report cache
+                    bodies = [{"url": f"{base_url}/company-{i}"} for i in range(opts["requests"])]
+                    result = await _load(client, "/research", bodies, opts["concurrency"], opts["requests"])
+                else:
+                    result = await _crawl(client, base_url)
+                result["stats"] = (await client.get("/stats")).json()
+    finally:
+        server.shutdown()
+    return {**result, "peak_rss_mb": _peak_rss_mb(), "baseline_rss_mb": baseline}
+
+def run_pipeline(pipeline, opts):
+    return asyncio.run(_run(pipeline, opts))
+
+def report(pipeline, r):
+    rss = f"peak_rss={r['peak_rss_mb']:.0f} MB (+{r['peak_rss_mb'] - r['baseline_rss_mb']:.0f} under load)"
+    if pipeline == "crawl":
+        print(f"{pipeline:<9} {r['status']} in {r['wall_s']:.2f}s  fetched={r['pages_fetched']} indexed={r['pages_indexed']} "
+              f"rendered={r['pages_rendered']} errors={r['errors']}  {r['pages_per_s']:.1f} pages/s  {rss}")
+        return
+    print(f"{pipeline:<9} {r['requests']} req ({r['errors']} errors) in {r['wall_s']:.2f}s  {r['throughput']:.1f} req/s  "
+          f"p50={r['p50_ms']:.0f}ms p95={r['p95_ms']:.0f}ms p99={r['p99_ms']:.0f}ms  {rss}")
+    top = list(r["stages_ms"].items())[:8]
+    print("          per request: " + ", ".join(f"{k} {v:.0f}ms" for k, v in top))
+    caches = {k: v for k, v in r["stats"].get("search_cache", {}).items() if k in ("hits", "misses")}
+    if caches: print(f"          search cache: {caches}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipelines", nargs="+", default=["chat", "research", "crawl"], choices=["chat", "research", "crawl"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64, help="requests per pipeline")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per stub LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds per fake search call")
+    parser.add_argument("--hash-embeddings", action="store_true", help="model-free embedders instead of fastembed")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+    opts = vars(args)
+
+    print(f"== concurrency={args.concurrency} requests={args.requests} llm={args.llm_latency}s search={args.search_latency}s"
+          f"{' hash-embeddings' if args.hash_embeddings else ''}")
+    results = {}
+    for pipeline in args.pipelines:
+        # Fresh process per pipeline: clean caches, clean peak RSS. Not a Pool: its workers are
+        # daemonic and the crawler needs its own process pool.
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[pipeline] = pool.submit(run_pipeline, pipeline, opts).result()
+        report(pipeline, results[pipeline])
+    if args.json: print(json.dumps(results, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
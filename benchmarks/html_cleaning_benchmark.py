@@ -0,0 +1,105 @@
+"""Micro-benchmark: HTML -> markdown, single-parse lxml cleaner vs the legacy BeautifulSoup + MarkItDown path.
+
+Each path runs in a fresh process over every page in the corpus (data/pages by default, or any
+directory of saved .html files) and reports pages/s, MB/s and peak RSS above the post-import
+baseline. --processes N additionally runs the lxml path in a process pool, as the crawler does.
+
+    python -m benchmarks.html_cleaning_benchmark [--pages DIR] [--repeat 20] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+DATA = Path(__file__).parent / "data" / "pages"
+BASE_URL = "https://northwind.example/"
+
+def legacy_convert(raw_html, url):
+    """The crawler's pre-lxml path: html.parser soup, keyword scan, re-serialize, MarkItDown parses again."""
+    from bs4 import BeautifulSoup
+    from src.agents.common.crawler_agent import MockResponse
+    soup = BeautifulSoup(raw_html, 'html.parser')
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+    for tag in soup(['nav', 'footer', 'header', 'aside', 'script', 'style', 'svg', 'form', 'noscript', 'iframe']):
+        tag.decompose()
+    noise_keywords = ['menu', 'navigation', 'nav-', 'sidebar', 'footer', 'cookie', 'banner', 'popup']
+    for element in soup.find_all(['div', 'section', 'ul']):
+        classes = element.get("class", [])
+        eid = element.get("id", "")
+        if (classes and any(k in str(c).lower() for c in classes for k in noise_keywords)) or \
+           (eid and any(k in str(eid).lower() for k in noise_keywords)):
+            element.decompose()
+    result = _markitdown().convert_response(response=MockResponse(content=str(soup).encode("utf-8"), url=url))
+    return title, links, result.text_content
+
+_md = None
+
+def _markitdown():
+    global _md
+    if _md is None:
+        from markitdown import MarkItDown
+        _md = MarkItDown()
+    return _md
+
+def _converter(name):
+    if name == "legacy":
+        _markitdown()
+        return legacy_convert
+    from src.utils.html_cleaner import html_to_markdown
+    return html_to_markdown
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+def run_serial(name, pages, repeat):
+    """Runs in its own process so peak RSS belongs to this path alone."""
+    convert = _converter(name)
+    baseline = _peak_rss_mb()
+    chars = sum(len(convert(html, BASE_URL)[2]) for html in pages)  # warm-up, also the output size
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages: convert(html, BASE_URL)
+    return time.perf_counter() - start, chars, baseline, _peak_rss_mb()
+
+def run_pool(pages, repeat, processes):
+    from src.utils.html_cleaner import html_to_markdown
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        list(pool.map(html_to_markdown, pages, [BASE_URL] * len(pages)))  # start workers
+        start = time.perf_counter()
+        work = pages * repeat
+        list(pool.map(html_to_markdown, work, [BASE_URL] * len(work), chunksize=4))
+        elapsed = time.perf_counter() - start
+    return elapsed, _peak_rss_mb(resource.RUSAGE_CHILDREN)
+
+def report(name, pages, repeat, elapsed, rss):
+    n = len(pages) * repeat
+    mb = sum(len(p.encode("utf-8")) for p in pages) * repeat / 1e6
+    print(f"{name:<16} {n / elapsed:8.1f} pages/s {mb / elapsed:7.2f} MB/s  {elapsed * 1000 / n:6.2f} ms/page  {rss}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=Path, default=DATA, help="directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=0, help="also run the lxml path on a pool of N processes")
+    args = parser.parse_args()
+
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(args.pages.glob("*.html"))]
+    size = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"== {len(pages)} pages ({size:.0f} KiB avg) x {args.repeat} passes")
+    # Pool first: RUSAGE_CHILDREN keeps the largest child ever reaped, so it must see only pool workers
+    pooled = run_pool(pages, args.repeat, args.processes) if args.processes else None
+    # A fresh process per path: no shared imports or allocator state skews the RSS numbers
+    ctx = multiprocessing.get_context("spawn")
+    for name in ("legacy", "lxml"):
+        with ctx.Pool(1) as pool:
+            elapsed, chars, baseline, peak = pool.apply(run_serial, (name, pages, args.repeat))
+        report(name, pages, args.repeat, elapsed, f"peak_rss={peak:.0f} MB (+{peak - baseline:.0f} over imports)  out={chars / len(pages):.0f} chars/page")
+    if pooled:
+        elapsed, peak = pooled
+        report(f"lxml x{args.processes} procs", pages, args.repeat, elapsed, f"peak_rss={peak:.0f} MB largest worker")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Multi-worker scaling benchmark: /chat throughput with 1, 2, 4, ... uvicorn worker processes.
+
+Serves the real app with `uvicorn --workers N` against the stand-ins in benchmarks/standins.py. Every
+worker shares one TCP fakeredis (sessions, caches, rate limits, locks) and gets its own in-memory
+Qdrant seeded with the benchmark memo. Load comes from separate client processes so the
+generator doesn't compete with a single worker for one core.
+
+    pip install fakeredis
+    python -m benchmarks.scaling_benchmark [--workers 1 2 4] [--concurrency 64] [--duration 15]
+        [--llm-latency 0.05] [--clients 2] [--hash-embeddings] [--answer-cache]
+
+Throughput only scales up to the number of free cores: run it on a machine with at least as many
+cores as the largest worker count plus the client processes.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+DATA = Path(__file__).parent / "data"
+ROOT = Path(__file__).parent.parent
+
+def build_app():
+    """uvicorn --factory entry point, called once in every worker process."""
+    import logging
+    from benchmarks.standins import install
+    opts = json.loads(os.environ["BENCH_OPTS"])
+    install(opts["search_endpoint"], opts["llm_latency"], opts["hash_embeddings"], tuple(opts["redis"]))
+    logging.getLogger("bowmen").setLevel(logging.WARNING)
+    from src.utils.utils import load_config
+    load_config()['cache']['answers']['enabled'] = opts["answer_cache"]
+    from src.memory.memory_manager import MemoryManager, REPORT_SOURCE
+    from src.utils.chunker import MarkdownChunker
+    pieces = MarkdownChunker().split((DATA / "memo.md").read_text())
+    MemoryManager().save_knowledge(opts["site_url"], [c.text for c in pieces], [{"source": REPORT_SOURCE, "heading": c.heading} for c in pieces])
+    import main
+    return main.app
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values: return 0.0
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _client(base, bodies, concurrency, duration):
+    import httpx
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.post("/chat", json=bodies[i % len(bodies)])
+                    ok = resp.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok: latencies.append(time.perf_counter() - start)
+                else: errors += 1
+                i += concurrency
+
+        await asyncio.gather(*(user(k) for k in range(concurrency)))
+    return latencies, errors
+
+def run_client(base, bodies, concurrency, duration):
+    return asyncio.run(_client(base, bodies, concurrency, duration))
+
+def _wait_ready(base, proc, timeout=120):
+    import httpx
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None: raise SystemExit(f"server exited with {proc.returncode}")
+        try:
+            if httpx.get(f"{base}/stats", timeout=2).status_code == 200: return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit("server did not come up")
+
+def bench(workers, opts, bodies, clients):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "BENCH_OPTS": json.dumps(opts), "PYTHONPATH": str(ROOT)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.scaling_benchmark:build_app", "--factory",
+         "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    try:
+        _wait_ready(base, proc)
+        per_client = max(1, opts["concurrency"] // opts["clients"])
+        # Warm-up: every worker builds its clients, router and caches before the measured run
+        list(clients.map(run_client, [base] * opts["clients"], [bodies] * opts["clients"], [per_client] * opts["clients"], [min(5, opts["duration"])] * opts["clients"]))
+        results = list(clients.map(run_client, [base] * opts["clients"], [bodies] * opts["clients"], [per_client] * opts["clients"], [opts["duration"]] * opts["clients"]))
+    finally:
+        proc.terminate()
+        proc.wait(30)
+    latencies = [l for lat, _ in results for l in lat]
+    return {
+        "workers": workers, "requests": len(latencies), "errors": sum(e for _, e in results),
+        "throughput": len(latencies) / opts["duration"],
+        "p50_ms": percentile(latencies, 50) * 1000, "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight across all clients")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of measured load per worker count")
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds per fake search call")
+    parser.add_argument("--hash-embeddings", action="store_true", help="model-free embedders instead of fastembed")
+    parser.add_argument("--answer-cache", action="store_true", help="keep the semantic answer cache on (repeat questions get cheap)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    from benchmarks.standins import serve_site, serve_redis
+    site, site_url = serve_site(args.search_latency)
+    redis_server, redis_address = serve_redis()
+    opts = {**vars(args), "search_endpoint": f"{site_url}/search", "site_url": site_url, "redis": list(redis_address)}
+    queries = json.loads((DATA / "memo_queries.json").read_text())
+    bodies = [{"url": site_url, "message": q["query"]} for q in queries]
+
+    print(f"== /chat, {os.cpu_count()} CPUs, concurrency={args.concurrency} over {args.clients} client processes, "
+          f"{args.duration:.0f}s per run, llm={args.llm_latency}s{' hash-embeddings' if args.hash_embeddings else ''}")
+    results = []
+    with ProcessPoolExecutor(args.clients, mp_context=multiprocessing.get_context("spawn")) as clients:
+        for workers in args.workers:
+            r = bench(workers, opts, bodies, clients)
+            base = results[0]["throughput"] if results else r["throughput"]
+            results.append(r)
+            print(f"workers={workers:<3} {r['throughput']:7.1f} req/s  x{r['throughput'] / base if base else 0:.2f}  "
+                  f"p50={r['p50_ms']:.0f}ms p95={r['p95_ms']:.0f}ms p99={r['p99_ms']:.0f}ms  ({r['requests']} ok, {r['errors']} errors)")
+    site.shutdown()
+    redis_server.shutdown()
+    if args.json: print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
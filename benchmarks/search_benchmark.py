@@ -0,0 +1,63 @@
+"""Search hedging benchmark: tail latency of one slow-tailed provider alone vs. hedged with a second one.
+
+Both providers are FakeSearchProviders (no network, no keys). The primary answers in `--latency` seconds
+but `--tail-rate` of its calls stall for `--tail-latency`; the backup is uniformly a bit slower. The
+hedged run asks the backup whenever the primary is past its own p90.
+
+    python -m benchmarks.search_benchmark [--queries 400] [--concurrency 16] [--latency 0.05]
+        [--tail-rate 0.05] [--tail-latency 1.5] [--backup-latency 0.08]
+"""
+import time
+import asyncio
+import argparse
+from src.agents.common.search_providers import FakeSearchProvider, SearchService
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values: return 0.0
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+async def run(service, queries, concurrency):
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(q):
+        async with gate:
+            start = time.perf_counter()
+            await service.search(q)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(f"query {i}") for i in range(queries)))
+    return latencies
+
+def providers(args):
+    return [
+        FakeSearchProvider("primary", latency=args.latency, jitter=args.latency / 2, tail_rate=args.tail_rate, tail_latency=args.tail_latency),
+        FakeSearchProvider("backup", latency=args.backup_latency, jitter=args.backup_latency / 2),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="primary's usual latency (s)")
+    parser.add_argument("--tail-rate", type=float, default=0.05, help="share of primary calls that stall")
+    parser.add_argument("--tail-latency", type=float, default=1.5, help="primary's stalled latency (s)")
+    parser.add_argument("--backup-latency", type=float, default=0.08)
+    args = parser.parse_args()
+
+    print(f"== {args.queries} queries, concurrency={args.concurrency}, primary {args.latency * 1000:.0f}ms "
+          f"({args.tail_rate:.0%} at {args.tail_latency * 1000:.0f}ms), backup {args.backup_latency * 1000:.0f}ms")
+    for label, hedge in (("single", False), ("hedged", True)):
+        ps = providers(args)
+        service = SearchService(ps, hedge=hedge, min_samples=20, default_delay=args.latency * 3)
+        latencies = asyncio.run(run(service, args.queries, args.concurrency))
+        calls = sum(p.calls for p in ps)
+        print(f"{label:<7} p50={percentile(latencies, 50) * 1000:5.0f}ms p90={percentile(latencies, 90) * 1000:5.0f}ms "
+              f"p99={percentile(latencies, 99) * 1000:5.0f}ms max={max(latencies) * 1000:5.0f}ms  "
+              f"provider calls={calls} (+{calls / args.queries - 1:.0%})  hedged={service.stats['hedged']} backup_wins={service.stats['backup_wins']}")
+
+if __name__ == "__main__":
+    main()
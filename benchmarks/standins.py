@@ -0,0 +1,140 @@
+"""Deterministic local stand-ins for every external dependency of the app.
+
+- a static site (saved pages in data/pages, robots.txt, sitemap.xml) the crawler can fetch
+- a Serper-compatible search endpoint with configurable latency on the same server
+- the offline stub LLM with configurable latency
+- QdrantClient(":memory:") and fakeredis in place of the real servers (in-process, or one TCP fakeredis
+  shared by several worker processes)
+- optional hashing embedders for machines without the fastembed models cached
+
+`install()` must run before main.py (or any pipeline) is imported: pipelines read config at build time.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+PAGES = Path(__file__).parent / "data" / "pages"
+WORD = re.compile(r"\w+")
+DIM = 384
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Every path serves one of the saved pages, so the link graph inside them is fully crawlable."""
+    pages = []
+    search_latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args): pass
+
+    def _send(self, status, body: bytes, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        host = f"http://{self.headers.get('Host')}"
+        path = self.path.split("?")[0]
+        if path == "/robots.txt":
+            return self._send(200, f"User-agent: *\nDisallow: /admin\nSitemap: {host}/sitemap.xml\n".encode(), "text/plain")
+        if path == "/sitemap.xml":
+            locs = "".join(f"<url><loc>{host}/{p}</loc></url>" for p in ("", "pricing", "blog/adaptive-thresholds"))
+            body = f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+            return self._send(200, body.encode(), "application/xml")
+        if path.startswith(("/static/", "/logos/")): return self._send(404, b"", "text/plain")
+        body = self.pages[zlib.crc32(path.rstrip("/").encode()) % len(self.pages)]
+        etag = f'"{zlib.crc32(body):x}"'
+        if self.headers.get("If-None-Match") == etag: return self._send(304, b"", "text/html")
+        self._send(200, body, "text/html; charset=utf-8", {"ETag": etag})
+
+    def do_POST(self):
+        # Serper-format search: {"q": ...} -> {"organic": [...]}
+        query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}").get("q", "")
+        time.sleep(self.search_latency)
+        organic = [
+            {"title": f"Result {i} for {query}", "snippet": f"Northwind Analytics {query}: figure {zlib.crc32(f'{query}{i}'.encode()) % 1000}M.", "link": f"https://example.com/{i}"}
+            for i in range(5)
+        ]
+        self._send(200, json.dumps({"organic": organic}).encode(), "application/json")
+
+def serve_site(search_latency: float = 0.0):
+    """Starts the static site + search endpoint on a free localhost port; returns (server, base_url)."""
+    SiteHandler.pages = [p.read_bytes() for p in sorted(PAGES.glob("*.html"))]
+    SiteHandler.search_latency = search_latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class HashEmbedding:
+    """Dense stand-in: hashed bag of word prefixes, L2-normalised. Deterministic and model-free."""
+    def _vec(self, text):
+        import numpy as np
+        v = np.zeros(DIM, dtype=np.float32)
+        for w in WORD.findall(text.lower()): v[zlib.crc32(w[:5].encode()) % DIM] += 1.0
+        return v / (np.linalg.norm(v) or 1.0)
+    def embed(self, docs, batch_size=None, **kw): return (self._vec(d) for d in docs)
+    def query_embed(self, query, **kw): return (self._vec(q) for q in ([query] if isinstance(query, str) else query))
+
+class HashSparseEmbedding:
+    """Sparse stand-in: hashed term frequencies (Qdrant applies IDF, like BM25)."""
+    def _sparse(self, text):
+        import numpy as np
+        counts = {}
+        for w in WORD.findall(text.lower()):
+            i = zlib.crc32(w.encode()) % 2**20
+            counts[i] = counts.get(i, 0) + 1.0
+        return SimpleNamespace(indices=np.array(list(counts), dtype=np.int64), values=np.array(list(counts.values()), dtype=np.float32))
+    def embed(self, docs, batch_size=None, **kw): return (self._sparse(d) for d in docs)
+    def query_embed(self, query, **kw): return (self._sparse(q) for q in ([query] if isinstance(query, str) else query))
+
+def serve_redis():
+    """TCP fakeredis on a free localhost port, for stand-ins shared across processes; returns (server, (host, port))."""
+    import fakeredis
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address
+
+def install(search_endpoint: str, llm_latency: float = 0.5, hash_embeddings: bool = False, redis_address=None):
+    """Points config and the container at the stand-ins. Call once per process, before importing main.
+
+    With `redis_address` the app talks to that (shared) Redis through its normal clients instead of in-process fakeredis.
+    """
+    import fakeredis
+    from qdrant_client import QdrantClient
+    from src.utils.utils import load_config
+    from src.utils.container import get_container
+    from src.utils import llm_client
+
+    os.environ.setdefault("SERPER_API_KEY", "offline")
+    os.environ.pop("SERPAPI_API_KEY", None)
+    config = load_config()  # cached: edits here are what every module sees
+    config['llm']['backend'] = "stub"
+    config['llm']['stub_latency'] = llm_latency
+    config['tools']['search_providers'] = {"serper": {"endpoint": search_endpoint, "api_key_env": "SERPER_API_KEY"}}
+    config['tools']['rate_limits'] = {"serper": 10000}  # measure the app, not the provider quota
+    config['jobs'].update({"backend": "redis", "run_in_api": False})  # crawls run in a worker, as deployed
+    llm_client._backend = llm_client.StubBackend(llm_latency)
+
+    container = get_container()
+    container._instances["qdrant"] = QdrantClient(":memory:")
+    if redis_address:
+        config['memory']['redis_host'], config['memory']['redis_port'] = redis_address
+    else:
+        server = fakeredis.FakeServer()
+        container._instances.update({
+            "redis": fakeredis.FakeRedis(server=server, decode_responses=True),
+            "aredis": fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+            "aredis_bytes": fakeredis.FakeAsyncRedis(server=server),
+        })
+    if hash_embeddings:
+        container._instances.update({"embedder": HashEmbedding(), "sparse_embedder": HashSparseEmbedding()})
+    return container
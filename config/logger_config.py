@@ -14,6 +14,14 @@ if not logger.handlers:
 def get_logger(name): return logger.getChild(name)
 
 class WorkNotesManager:
-    def __init__(self): self._notes = []
-    def add_note(self, agent, msg): self._notes.append(f"[{agent}] {msg}")
+    def __init__(self, sink=None):
+        self._notes = []
+        self.sink = sink  # optional asyncio.Queue that receives every note and event as it happens
+    def add_note(self, agent, msg):
+        self._notes.append(f"[{agent}] {msg}")
+        self.emit("note", {"agent": agent, "message": msg})
+    def emit(self, event, data):
+        if self.sink is not None: self.sink.put_nowait({"event": event, **data})
+    @property
+    def streaming(self): return self.sink is not None
     def get_all_notes(self): return self._notes
\ No newline at end of file
@@ -1,34 +1,105 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
 from src.pipeline.research_pipeline import ResearchPipeline
 from src.pipeline.chat_pipeline import ChatPipeline
+from src.utils.container import get_container
+from src.utils.streaming import stream_events, ndjson
+from src.utils.tracing import metrics_payload
+from src.utils.utils import load_config
+from src.jobs.worker import build_worker
 
-app = FastAPI(title="Bowmen Unified Agent")
-researcher = ResearchPipeline()
-chatter = ChatPipeline()
+config = load_config()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Everything is built here, per process: with --workers N each worker gets its own clients and pipelines,
+    # and shares state with the others only through Redis and Qdrant
+    container = get_container()
+    app.state.researcher = ResearchPipeline()
+    app.state.chatter = ChatPipeline()
+    # With the HTTP-first fetcher Chromium is only needed for JS-rendered pages; it then starts on first use
+    if not config.get('crawler', {}).get('http_first', True): await container.browser_pool.start()
+    # Embed the router's labelled examples now rather than on the first chat message
+    if app.state.chatter.router: asyncio.create_task(app.state.chatter.router.warmup())
+    worker = None
+    settings = config.get('jobs', {})
+    if settings.get('backend', 'redis') == 'memory' or settings.get('run_in_api', False):
+        worker = asyncio.create_task(build_worker().run())
+    yield
+    if worker:
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+    await container.aclose()
+
+app = FastAPI(title="Bowmen Unified Agent", lifespan=lifespan)
 
 class Request(BaseModel):
     url: str
     message: str = ""
 
 @app.post("/research")
-async def start_research(req: Request, background_tasks: BackgroundTasks):
+async def start_research(req: Request):
     try:
-        result = await researcher.run(req.url)
-        crawl_id = result.get("tracking_id")
-        if crawl_id:
-            background_tasks.add_task(researcher.trigger_deep_crawl, req.url, crawl_id)
-        return result
+        # The pipeline queues the deep crawl (or reuses the domain's current one) and returns its tracking_id
+        return await app.state.researcher.run(req.url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/chat")
 async def chat(req: Request):
     try:
-        return await chatter.run(req.message, req.url)
+        return await app.state.chatter.run(req.message, req.url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/research/stream")
+async def stream_research(req: Request):
+    return StreamingResponse(
+        ndjson(stream_events(lambda wn: app.state.researcher.run(req.url, wn))),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/chat/stream")
+async def stream_chat(req: Request):
+    return StreamingResponse(
+        ndjson(stream_events(lambda wn: app.state.chatter.run(req.message, req.url, wn))),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/crawl/{crawl_id}")
+async def crawl_status(crawl_id: str):
+    job = await get_container().jobs.get(crawl_id)
+    if job is None: raise HTTPException(status_code=404, detail="Unknown crawl id")
+    return job
+
+@app.delete("/crawl/{crawl_id}")
+async def cancel_crawl(crawl_id: str):
+    job = await get_container().jobs.cancel(crawl_id)
+    if job is None: raise HTTPException(status_code=404, detail="Unknown crawl id")
+    return job
+
+@app.get("/stats")
+async def stats():
+    out = get_container().stats()
+    if app.state.chatter.router: out["router"] = app.state.chatter.router.stats
+    if app.state.researcher.reports: out["report_cache"] = app.state.researcher.reports.get_stats()
+    return out
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Serve the API.")
+    parser.add_argument("--workers", type=int, default=config['server'].get('workers', 1), help="uvicorn worker processes")
+    args = parser.parse_args()
+    if args.workers > 1 and config.get('jobs', {}).get('backend', 'redis') == 'memory':
+        raise SystemExit("Multiple workers need jobs.backend: redis (the memory queue lives in one process)")
+    # Workers import the app by name and run the lifespan themselves
+    uvicorn.run("main:app" if args.workers > 1 else app, host=config['server']['host'], port=config['server']['port'], workers=args.workers)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from config.logger_config import get_logger
+
+logger = get_logger("browser_pool")
+
+class BrowserPool:
+    """One long-lived Chromium per process; hands out pages from a fixed set of recycled contexts."""
+    def __init__(self, size: int = 5, max_pages_per_context: int = 50):
+        self.size = size
+        self.max_pages_per_context = max_pages_per_context
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+        self._contexts = {}  # context -> (generation, pages served)
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self.stats = {"pages": 0, "recycled": 0, "relaunches": 0}
+
+    def is_healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        async with self._lock:
+            if self.is_healthy(): return
+            if self._browser is not None:
+                self.stats["relaunches"] += 1
+                logger.warning("⚠️ Browser disconnected. Relaunching pool.")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._generation += 1
+            self._contexts.clear()
+            # Reuse the queue so callers already waiting on it receive the fresh contexts
+            if self._idle is None: self._idle = asyncio.Queue()
+            while not self._idle.empty(): self._idle.get_nowait()
+            for _ in range(self.size): await self._idle.put(await self._new_context())
+            logger.info(f"🌐 Browser pool ready ({self.size} contexts)")
+
+    async def stop(self):
+        async with self._lock:
+            if self._browser is not None:
+                try: await self._browser.close()
+                except Exception: pass
+            if self._playwright is not None:
+                await self._playwright.stop()
+            self._browser = self._playwright = self._idle = None
+            self._contexts.clear()
+
+    async def _new_context(self):
+        ctx = await self._browser.new_context()
+        self._contexts[ctx] = (self._generation, 0)
+        return ctx
+
+    async def _release(self, ctx):
+        generation, served = self._contexts.pop(ctx, (None, 0))
+        if generation != self._generation:
+            return  # belongs to a browser that has since been relaunched
+        if served + 1 >= self.max_pages_per_context:
+            self.stats["recycled"] += 1
+            try: await ctx.close()
+            except Exception: pass
+            ctx = await self._new_context()
+        else:
+            self._contexts[ctx] = (generation, served + 1)
+        await self._idle.put(ctx)
+
+    @asynccontextmanager
+    async def page(self):
+        if not self.is_healthy(): await self.start()
+        ctx = await self._idle.get()
+        page = None
+        try:
+            page = await ctx.new_page()
+            self.stats["pages"] += 1
+            yield page
+        finally:
+            if page:
+                try: await page.close()
+                except Exception: pass
+            if self.is_healthy(): await self._release(ctx)
+            else: self._contexts.pop(ctx, None)
+
+    def get_stats(self):
+        return {**self.stats, "healthy": self.is_healthy(), "idle": self._idle.qsize() if self._idle else 0, "size": self.size}
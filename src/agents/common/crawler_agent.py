@@ -1,22 +1,29 @@
 import asyncio
 import sys
-from urllib.parse import urlparse, urljoin
-from playwright.async_api import async_playwright
+from urllib.parse import urlparse
 from markitdown import MarkItDown
-from bs4 import BeautifulSoup
 from config.logger_config import get_logger
-from src.memory.memory_manager import MemoryManager
+from src.memory.memory_manager import MemoryManager, REPORT_SOURCE
+from src.memory.ingestion import IngestionPipeline
+from src.memory.page_manifest import PageManifest
+from src.agents.common.frontier import CrawlFrontier
+from src.agents.common.fetcher import PageFetcher, HTML_TYPES, DIRECT_TYPES
+from src.utils.container import get_container
+from src.utils.chunker import MarkdownChunker
+from src.utils.html_cleaner import html_to_markdown
+from src.utils.utils import load_config, content_hash, chunk_id, sanitize_url
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 logger = get_logger("crawler")
+config = load_config()
 
 class MockResponse:
-    def __init__(self, content: bytes, url: str):
+    def __init__(self, content: bytes, url: str, content_type: str = "text/html"):
         self.content = content
         self.url = url
-        self.headers = {"content-type": "text/html"}
+        self.headers = {"content-type": content_type}
         self.encoding = "utf-8"
         self.status_code = 200
     def iter_content(self, chunk_size=1024):
@@ -24,95 +31,185 @@ class MockResponse:
     @property
     def text(self): return self.content.decode("utf-8", errors="replace")
 
+class CrawlRun:
+    """State of one deep crawl. CrawlerAgent itself holds none, so concurrent crawls never interfere."""
+    def __init__(self, root_url, crawl_id, frontier, manifest, ingest, progress=None):
+        self.root_url = root_url  # as given: it names the Qdrant collection
+        self.crawl_id = crawl_id
+        self.frontier = frontier
+        self.manifest = manifest
+        self.ingest = ingest
+        self.progress = progress
+        self.crawled = set()  # reached this run, whatever the outcome: never pruned
+        self.gone = set()     # answered 404/410
+        self.errors = 0
+
+    async def report(self, field, n=1):
+        if field == "errors": self.errors += n
+        if self.progress:
+            try: await self.progress(field, n)
+            except Exception as e: logger.warning(f"Progress update failed: {e}")
+
 class CrawlerAgent:
-    def __init__(self, concurrency: int = 5):
-        self.concurrency = concurrency
+    def __init__(self, concurrency: int = None, incremental: bool = None):
+        settings = config.get('crawler', {})
+        # Workers mostly wait on plain HTTP now; Chromium use is still capped by browser_contexts
+        self.concurrency = concurrency or settings.get('concurrency', 16)
+        self.incremental = settings.get('incremental', True) if incremental is None else incremental
         self.memory = MemoryManager()
+        self.pool = get_container().browser_pool
         self.md = MarkItDown()
-        self.visited = set()
-        self.queue = asyncio.Queue()
-        self.root_url = ""
-        self.crawl_id = ""
+        self.chunker = MarkdownChunker(**config.get('chunking', {}))
+        self.max_pages = config['tools'].get('scrape_limit', 100)
+        self.max_depth = settings.get('max_depth')
+        self.bloom_threshold = settings.get('bloom_threshold', 20000)
+        self.use_sitemaps = settings.get('sitemaps', True)
+        self.respect_robots = settings.get('respect_robots', True)
+        self.user_agent = settings.get('user_agent', "Mozilla/5.0 (compatible; CompanyResearcher/1.0)")
+        self.fetcher = PageFetcher(
+            self.pool, min_text_chars=settings.get('min_text_chars', 250), http_first=settings.get('http_first', True)
+        )
 
-    def _clean_html(self, raw_html: str) -> bytes:
-        soup = BeautifulSoup(raw_html, 'html.parser')
-        for tag in soup(['nav', 'footer', 'header', 'aside', 'script', 'style', 'svg', 'form', 'noscript', 'iframe']):
-            tag.decompose()
-        # Heuristic cleaning
-        noise_keywords = ['menu', 'navigation', 'nav-', 'sidebar', 'footer', 'cookie', 'banner', 'popup']
-        for element in soup.find_all(['div', 'section', 'ul']):
-            classes = element.get("class", [])
-            eid = element.get("id", "")
-            if (classes and any(k in str(c).lower() for c in classes for k in noise_keywords)) or                (eid and any(k in str(eid).lower() for k in noise_keywords)):
-                element.decompose()
-        return str(soup).encode("utf-8")
+    async def _extract(self, res):
+        """FetchResult -> (page dict, links). HTML is parsed once with lxml in the process pool; PDFs and text go to MarkItDown."""
+        if res.content_type in HTML_TYPES:
+            loop = asyncio.get_running_loop()
+            title, links, content = await loop.run_in_executor(get_container().process_pool, html_to_markdown, res.html, res.url)
+        elif res.content_type in DIRECT_TYPES:
+            mock_resp = MockResponse(content=res.body, url=res.url, content_type=res.content_type)
+            result = await asyncio.to_thread(self.md.convert_response, response=mock_resp)
+            title, links, content = urlparse(res.url).path.rsplit("/", 1)[-1], [], result.text_content
+        else: return None, set()
+        return {
+            "url": res.url, "title": title, "content": content,
+            "etag": res.headers.get("etag"), "last_modified": res.headers.get("last-modified"), "bytes": len(res.body)
+        }, set(links)
 
     async def fetch_page(self, url: str) -> str:
         logger.info(f"🔎 Scout Crawling: {url}")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                html = await page.content()
-                clean_bytes = self._clean_html(html)
-                mock_resp = MockResponse(content=clean_bytes, url=url)
-                result = self.md.convert_response(response=mock_resp)
-                logger.info(f"✅ Scout Clean Fetch ({len(result.text_content)} chars)")
-                return result.text_content[:15000]
-            except Exception as e:
-                logger.error(f"Scout Failed: {e}")
-                return ""
-            finally:
-                await browser.close()
-
-    async def _crawl_page(self, context, url):
-        page = None
         try:
-            page = await context.new_page()
-            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            html = await page.content()
-            title = await page.title()
-            clean_bytes = self._clean_html(html)
-            mock_resp = MockResponse(content=clean_bytes, url=url)
-            result = self.md.convert_response(response=mock_resp)
-            links = await page.eval_on_selector_all("a[href]", "(els) => els.map(l => l.href)")
-            return {"url": url, "title": title, "content": result.text_content}, set(links)
-        except: return None, set()
-        finally:
-            if page: await page.close()
+            res = await self.fetcher.fetch(url)
+            data, _ = await self._extract(res) if res and not res.gone else (None, set())
+            if not data: return ""
+            logger.info(f"✅ Scout Clean Fetch ({len(data['content'])} chars{', rendered' if res.rendered else ''})")
+            return data['content'][:15000]
+        except Exception as e:
+            logger.error(f"Scout Failed: {e}")
+            return ""
+
+    async def _index_page(self, run, url, data, links):
+        entry = run.manifest.get(url)
+        record = {
+            "etag": data["etag"], "last_modified": data["last_modified"],
+            "hash": content_hash(data["content"]), "links": sorted(links)
+        }
+        if self.incremental and entry and entry.get("hash") == record["hash"]:
+            await run.manifest.put(url, {**entry, **record})
+            await run.report("pages_indexed")
+            logger.info(f"⏭️ Unchanged content: {url}")
+            return
 
-    async def _worker(self, context):
+        pieces = self.chunker.split(data['content'])
+        chunks = [c.text for c in pieces]
+        ids = [chunk_id(url, c) for c in chunks]
+        stale = set(entry.get("chunk_ids", [])) - set(ids) if entry else set()
+        if stale: await asyncio.to_thread(self.memory.delete_points, run.root_url, stale)
+        meta = [{"source": url, "title": data['title'], "crawl_id": run.crawl_id, "heading": c.heading} for c in pieces]
+        # The new hash is recorded only once the chunks are stored: a failed batch gets re-indexed next crawl
+        await run.ingest.submit(run.root_url, chunks, meta, on_indexed=lambda: run.manifest.put(url, {**record, "chunk_ids": ids}))
+        await run.report("pages_indexed")
+        logger.info(f"💾 Queued for indexing: {url}")
+
+    async def _worker(self, run):
+        frontier = run.frontier
         while True:
-            try: url = self.queue.get_nowait()
-            except asyncio.QueueEmpty: break
+            url, depth = await frontier.get()
+            # A page that fails to fetch or parse still exists as far as this crawl can tell
+            run.crawled.add(url)
             try:
-                data, links = await self._crawl_page(context, url)
-                if data and len(data['content']) > 200:
-                    chunks = [data['content'][i:i+1000] for i in range(0, len(data['content']), 1000)]
-                    meta = [{"source": url, "title": data['title'], "crawl_id": self.crawl_id} for _ in chunks]
-                    self.memory.save_knowledge(self.root_url, chunks, meta)
-                    logger.info(f"💾 Indexed: {url}")
-                    base = urlparse(self.root_url).netloc
-                    for link in links:
-                        parsed = urlparse(link)
-                        clean = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-                        if parsed.netloc == base and clean not in self.visited:
-                            self.visited.add(clean)
-                            await self.queue.put(clean)
-            except: pass
-            finally: self.queue.task_done()
+                entry = run.manifest.get(url) if self.incremental else None
+                res = await self.fetcher.fetch(url, entry.get("etag"), entry.get("last_modified")) if entry else await self.fetcher.fetch(url)
+                if res is None:
+                    await run.report("errors")
+                    continue
+                if res.gone:
+                    run.crawled.discard(url)
+                    run.gone.add(url)
+                    continue
+                await run.report("pages_fetched")
+                if res.rendered: await run.report("pages_rendered")
+                if res.not_modified:
+                    links = set(entry.get("links", []))
+                    logger.info(f"⏭️ Not modified: {url}")
+                else:
+                    data, links = await self._extract(res)
+                    if not data: continue
+                    await run.report("bytes", data["bytes"])
+                    if len(data['content']) <= 200: continue
+                    links = {link for link in links if frontier.in_scope(link)}
+                    await self._index_page(run, url, data, links)
+                for link in links:
+                    if frontier.add(link, depth + 1, base=res.url): await run.report("pages_queued")
+            except asyncio.CancelledError: raise
+            except: await run.report("errors")
+            finally: frontier.task_done()
 
-    async def deep_crawl(self, start_url: str, crawl_id: str, max_pages: int = 100):
-        self.root_url = start_url
-        self.crawl_id = crawl_id
-        self.visited.add(start_url)
-        await self.queue.put(start_url)
-        logger.info(f"🕷️ Starting Deep Crawl: {start_url}")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            contexts = [await browser.new_context() for _ in range(self.concurrency)]
-            tasks = [asyncio.create_task(self._worker(ctx)) for ctx in contexts]
-            try: await asyncio.wait_for(self.queue.join(), timeout=600)
-            except: logger.warning("Crawl Timeout.")
-            for t in tasks: t.cancel()
\ No newline at end of file
+    async def _seed(self, run):
+        """Queue everything the site's sitemaps list and apply robots.txt to the rest of the crawl."""
+        try:
+            robots, urls = await self.fetcher.discover(run.frontier.root_url, limit=run.frontier.max_pages)
+        except Exception as e:
+            logger.warning(f"Sitemap discovery failed: {e}")
+            return
+        if self.respect_robots: run.frontier.robots = robots
+        queued = sum(run.frontier.add(u, 1) for u in urls)
+        if queued: await run.report("pages_queued", queued)
+
+    async def _prune_removed(self, run):
+        """Drop chunks of pages the site answered 404/410 for and, if every fetch succeeded, of pages no
+        longer linked from it. After a failed fetch an unreached page may just sit behind the failure."""
+        manifest = run.manifest
+        removed = [
+            p for p in manifest.entries
+            if p != REPORT_SOURCE and (p in run.gone or (not run.errors and p not in run.crawled))
+        ]
+        if not removed: return
+        ids = [i for p in removed for i in manifest.get(p).get("chunk_ids", [])]
+        if ids: await asyncio.to_thread(self.memory.delete_points, run.root_url, ids)
+        await manifest.remove(removed)
+        logger.info(f"🧹 Removed {len(removed)} pages no longer on the site")
+
+    async def deep_crawl(self, start_url: str, crawl_id: str, max_pages: int = None, progress=None):
+        """`progress`, if given, is an async callable(field, n) fed pages_queued/fetched/indexed, bytes and errors."""
+        frontier = CrawlFrontier(
+            start_url, max_pages=max_pages or self.max_pages, max_depth=self.max_depth, bloom_threshold=self.bloom_threshold,
+            user_agent=self.user_agent
+        )
+        logger.info(f"🕷️ Starting Deep Crawl: {start_url} ({'incremental' if self.incremental else 'full'}, {frontier.max_pages} pages max)")
+        manifest = await PageManifest(start_url).load()
+        completed = False
+        settings = config.get('ingestion', {})
+        try:
+            async with IngestionPipeline(
+                self.memory,
+                batch_size=settings.get('batch_size', 64),
+                flush_interval=settings.get('flush_interval', 1.0),
+                max_pending=settings.get('max_pending', 256)
+            ) as ingest:
+                run = CrawlRun(start_url, crawl_id, frontier, manifest, ingest, progress)
+                await run.report("pages_queued")
+                tasks = [asyncio.create_task(self._worker(run)) for _ in range(self.concurrency)]
+                try:
+                    if self.use_sitemaps: await self._seed(run)
+                    await asyncio.wait_for(frontier.join(), timeout=600)
+                    completed = True
+                except asyncio.TimeoutError: logger.warning("Crawl Timeout.")
+                finally:
+                    for t in tasks: t.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"📊 Fetch tiers (agent lifetime): {self.fetcher.stats}")
+            # Only a crawl that reached every page can tell which ones disappeared
+            if completed and not frontier.truncated and self.incremental: await self._prune_removed(run)
+        finally:
+            # Once per crawl, not per batch: answers cached before it may rest on pages that changed
+            await asyncio.to_thread(self.memory.invalidate_answers, sanitize_url(start_url))
@@ -0,0 +1,171 @@
+import re
+import gzip
+import asyncio
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from config.logger_config import get_logger
+from src.utils.container import get_container
+from src.utils.tracing import span
+
+logger = get_logger("fetcher")
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+DIRECT_TYPES = ("application/pdf", "text/plain", "text/markdown")
+# Client-side app shells: an empty mount point, or a page that only asks for JavaScript
+EMPTY_MOUNT = re.compile(
+    r"<(div|main)[^>]+id=[\"'](root|app|__next|__nuxt|svelte|main-app)[\"'][^>]*>\s*</\1>|<app-root[^>]*>\s*</app-root>", re.I
+)
+NEEDS_JS = re.compile(r"(enable|turn on) javascript|requires javascript|javascript is (disabled|required)", re.I)
+INVISIBLE = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1>|<!--.*?-->", re.I | re.S)
+TAG = re.compile(r"<[^>]+>")
+SITEMAP_NS = re.compile(r"^\{[^}]+\}")
+
+@dataclass
+class FetchResult:
+    url: str  # final URL after redirects; base for relative links
+    status: int
+    content_type: str = ""
+    body: bytes = b""
+    headers: dict = field(default_factory=dict)
+    rendered: bool = False  # came from Playwright rather than the HTTP tier
+
+    @property
+    def html(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def gone(self) -> bool:
+        """The server says the page doesn't exist; anything else that fails may be transient."""
+        return self.status in (404, 410)
+
+def visible_text_length(html: str) -> int:
+    body = html.split("<body", 1)[-1]
+    return len(" ".join(TAG.sub(" ", INVISIBLE.sub(" ", body)).split()))
+
+def looks_js_rendered(html: str, min_text_chars: int = 250) -> bool:
+    """True when the server sent an app shell whose content only appears after scripts run."""
+    if EMPTY_MOUNT.search(html): return True
+    text = visible_text_length(html)
+    return text < min_text_chars or (text < 4 * min_text_chars and bool(NEEDS_JS.search(html)))
+
+class PageFetcher:
+    """Tiered fetch: pooled HTTP/2 keep-alive client first, Chromium only for pages that need scripts to render.
+
+    Static HTML, PDFs, plain text, robots.txt and sitemaps never touch the browser pool.
+    """
+    def __init__(self, pool=None, min_text_chars: int = 250, http_first: bool = True):
+        self.pool = pool or get_container().browser_pool
+        self.min_text_chars = min_text_chars
+        self.http_first = http_first
+        self.stats = {"http": 0, "rendered": 0, "not_modified": 0}
+
+    async def fetch(self, url: str, etag: str = None, last_modified: str = None) -> FetchResult:
+        """Returns None on failure, or a result with `gone` set for 404/410. Validators from a previous crawl
+        make the request conditional (304 = unchanged)."""
+        with span("crawler.fetch") as s:
+            res = await self._fetch(url, etag, last_modified)
+            if res: s.set(status=res.status, rendered=res.rendered, bytes=len(res.body))
+            return res
+
+    async def _fetch(self, url, etag, last_modified):
+        headers = {}
+        if etag: headers["If-None-Match"] = etag
+        if last_modified: headers["If-Modified-Since"] = last_modified
+        if not self.http_first:
+            if headers:
+                # The browser can't send validators; ask the HTTP tier just for the 304
+                res = await self._get(url, headers)
+                if res and res.not_modified: return self._count(res, "not_modified")
+            return await self._render(url)
+
+        res = await self._get(url, headers)
+        if res is None: return await self._render(url)
+        if res.not_modified: return self._count(res, "not_modified")
+        if res.gone: return res
+        if res.status >= 400: return None
+        if res.content_type in HTML_TYPES and looks_js_rendered(res.html, self.min_text_chars):
+            logger.info(f"🧩 JS-rendered page, escalating to browser: {url}")
+            rendered = await self._render(url)
+            # Keep the server's validators so the next crawl can still ask for a 304
+            if rendered: rendered.headers = {**res.headers, **rendered.headers}
+            return rendered or res
+        return self._count(res, "http")
+
+    def _count(self, res, tier):
+        self.stats[tier] += 1
+        return res
+
+    async def _get(self, url, headers=None):
+        try:
+            resp = await get_container().http.get(url, headers=headers)
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            return None
+        return FetchResult(
+            url=str(resp.url), status=resp.status_code,
+            content_type=resp.headers.get("content-type", "").split(";")[0].strip().lower(),
+            body=resp.content, headers={k.lower(): v for k, v in resp.headers.items()}
+        )
+
+    async def _render(self, url):
+        try:
+            async with self.pool.page() as page:
+                resp = await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+                html = await page.content()
+                final_url = page.url
+            headers = {k.lower(): v for k, v in resp.headers.items()} if resp else {}
+            status = resp.status if resp else 200
+            if status in (404, 410): return FetchResult(url=final_url, status=status, rendered=True)
+            if status >= 400: return None
+            return self._count(FetchResult(
+                url=final_url, status=status, content_type="text/html",
+                body=html.encode("utf-8"), headers=headers, rendered=True
+            ), "rendered")
+        except Exception as e:
+            logger.warning(f"Browser fetch failed for {url}: {e}")
+            return None
+
+    async def robots(self, root_url: str):
+        """Parsed robots.txt (None if there isn't one) and the sitemap URLs it lists."""
+        res = await self._get(urljoin(root_url, "/robots.txt"))
+        if not res or res.status != 200 or "html" in res.content_type: return None, []
+        lines = res.html.splitlines()
+        parser = RobotFileParser()
+        parser.parse(lines)
+        sitemaps = [l.split(":", 1)[1].strip() for l in lines if l.lower().startswith("sitemap:")]
+        return parser, sitemaps
+
+    async def sitemap_urls(self, sitemaps: list, limit: int = 1000, max_files: int = 20) -> list:
+        """Page URLs from sitemaps, following sitemap indexes breadth-first, up to `limit` URLs."""
+        pending, seen, urls = list(sitemaps), set(), []
+        while pending and len(urls) < limit and len(seen) < max_files:
+            sitemap = pending.pop(0)
+            if sitemap in seen: continue
+            seen.add(sitemap)
+            res = await self._get(sitemap)
+            if not res or res.status != 200: continue
+            body = res.body
+            if body[:2] == b"\x1f\x8b":
+                try: body = await asyncio.to_thread(gzip.decompress, body)
+                except Exception: continue
+            try: root = ET.fromstring(body)
+            except ET.ParseError: continue
+            locs = [el.text.strip() for el in root.iter() if SITEMAP_NS.sub("", el.tag) == "loc" and el.text]
+            if SITEMAP_NS.sub("", root.tag) == "sitemapindex": pending.extend(locs)
+            else: urls.extend(locs[:limit - len(urls)])
+        return urls
+
+    async def discover(self, root_url: str, limit: int = 1000):
+        """robots.txt rules plus sitemap URLs for a site, used to seed a crawl frontier."""
+        robots, sitemaps = await self.robots(root_url)
+        if not sitemaps: sitemaps = [urljoin(root_url, "/sitemap.xml")]
+        urls = await self.sitemap_urls(sitemaps, limit=limit)
+        host = urlparse(root_url).netloc
+        logger.info(f"🗺️ {host}: {len(urls)} URLs from {len(sitemaps)} sitemap(s){', robots.txt rules loaded' if robots else ''}")
+        return robots, urls
@@ -0,0 +1,102 @@
+import re
+import math
+import asyncio
+import hashlib
+from urllib.parse import urlparse, urlunparse, urljoin, parse_qsl, urlencode
+
+TRACKING_PARAM = re.compile(r"^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|_ga|_hsenc|_hsmi)$", re.I)
+SKIP_EXTENSIONS = re.compile(
+    r"\.(png|jpe?g|gif|svg|webp|ico|css|js|mjs|json|zip|gz|tar|rar|7z|dmg|exe|mp3|mp4|mov|avi|webm|woff2?|ttf|eot)$", re.I
+)
+
+PRODUCT = re.compile(r"([A-Za-z][\w.-]*)/[\w.]+")
+
+def robots_agent(user_agent: str) -> str:
+    """The name robots.txt groups address us by: "CompanyResearcher" for "Mozilla/5.0 (compatible; CompanyResearcher/1.0)".
+    urllib's parser only compares the part before the first "/", which for browser-style strings is "Mozilla"."""
+    names = [n for n in PRODUCT.findall(user_agent or "") if n.lower() != "mozilla"]
+    return names[-1] if names else (user_agent or "*")
+
+def site_of(netloc: str) -> str:
+    return netloc.lower().removeprefix("www.")
+
+def normalize_url(url: str, base: str = None):
+    """Canonical form used for dedupe: absolute http(s), lowercase host, no default port, fragment
+    or tracking params, sorted query, no trailing slash. Returns None for URLs not worth crawling."""
+    if base: url = urljoin(base, url)
+    p = urlparse(url.strip())
+    if p.scheme not in ("http", "https") or not p.hostname: return None
+    host = p.hostname.lower()
+    if p.port and p.port != {"http": 80, "https": 443}[p.scheme]: host = f"{host}:{p.port}"
+    path = re.sub(r"/{2,}", "/", p.path or "/")
+    if len(path) > 1: path = path.rstrip("/")
+    if SKIP_EXTENSIONS.search(path): return None
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if not TRACKING_PARAM.match(k)))
+    return urlunparse((p.scheme, host, path, "", query, ""))
+
+class BloomFilter:
+    """Fixed-memory probabilistic set for very large sites: no false negatives, ~`error_rate` false positives."""
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item): self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class CrawlFrontier:
+    """URL frontier owned by exactly one crawl: normalization, dedupe, robots rules, page budget and depth limit.
+
+    Nothing here is shared between crawls, so any number of them can run side by side on one
+    CrawlerAgent and browser pool.
+    """
+    def __init__(self, root_url: str, max_pages: int = 100, max_depth: int = None, bloom_threshold: int = 20000,
+                 user_agent: str = "*"):
+        self.root_url = normalize_url(root_url) or root_url
+        self.site = site_of(urlparse(self.root_url).netloc)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        # An exact set is cheaper up to a point; past it, memory stays flat with a Bloom filter
+        self.seen = BloomFilter(max_pages * 4) if max_pages > bloom_threshold else set()
+        self.queue = asyncio.Queue()
+        self.scheduled = 0
+        self.truncated = False  # True once the page budget turned a URL away
+        self.robots = None  # urllib RobotFileParser, set once robots.txt has been read
+        self.user_agent = robots_agent(user_agent)  # robots.txt groups naming our crawler apply, else "*"
+        self.add(self.root_url, 0)
+
+    def in_scope(self, url: str) -> bool:
+        return site_of(urlparse(url).netloc) == self.site
+
+    @staticmethod
+    def _key(url: str) -> str:
+        # www.example.com/x and example.com/x are the same page
+        return url.replace("://www.", "://", 1)
+
+    def add(self, url: str, depth: int, base: str = None) -> bool:
+        url = normalize_url(url, base)
+        if not url or not self.in_scope(url) or self._key(url) in self.seen: return False
+        if self.max_depth is not None and depth > self.max_depth: return False
+        if self.robots and not self.robots.can_fetch(self.user_agent, url): return False
+        if self.scheduled >= self.max_pages:
+            self.truncated = True
+            return False
+        self.seen.add(self._key(url))
+        self.scheduled += 1
+        self.queue.put_nowait((url, depth))
+        return True
+
+    async def get(self):
+        return await self.queue.get()
+
+    def task_done(self): self.queue.task_done()
+
+    async def join(self): await self.queue.join()
@@ -0,0 +1,230 @@
+import os
+import time
+import zlib
+import random
+import asyncio
+from collections import deque
+from src.utils.utils import load_config
+from src.utils.rate_limiter import RateLimiter, RedisRateLimiter
+from src.utils.container import get_container
+from src.utils.tracing import span
+from config.logger_config import get_logger
+
+logger = get_logger("search")
+config = load_config()
+
+# Shared across ToolsAgent instances so every pipeline respects the same provider quota
+_rate_limiters = {}
+
+def get_rate_limiter(provider: str):
+    if provider not in _rate_limiters:
+        rate = config['tools'].get('rate_limits', {}).get(provider, 5)
+        # Shared through Redis by default: with several API workers the quota is per deployment, not per process
+        if config['tools'].get('shared_rate_limits', True):
+            _rate_limiters[provider] = RedisRateLimiter(get_container().aredis, f"search:{provider}", rate)
+        else:
+            _rate_limiters[provider] = RateLimiter(rate)
+    return _rate_limiters[provider]
+
+class SearchError(Exception):
+    """A provider didn't answer: HTTP error, unreadable payload or timeout."""
+
+def _result(item: dict) -> dict:
+    return {"title": item.get("title"), "snippet": item.get("snippet"), "link": item.get("link")}
+
+class SearchProvider:
+    """One web search API; subclasses send the request and normalise the reply to [{title, snippet, link}]."""
+    metered = True  # counts against tools.rate_limits
+
+    def __init__(self, name: str, endpoint: str, api_key: str = None, client=None, num_results: int = 5):
+        self.name = name
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.client = client
+        self.num_results = num_results
+
+    async def search(self, query: str) -> list:
+        resp = await self._request(query)
+        resp.raise_for_status()
+        return self._parse(resp.json())[:self.num_results]
+
+class SerpApiProvider(SearchProvider):
+    async def _request(self, query):
+        return await self.client.get(self.endpoint, params={"api_key": self.api_key, "q": query, "engine": "google"})
+
+    def _parse(self, data):
+        return [_result(item) for item in data.get("organic_results", [])]
+
+class SerperProvider(SearchProvider):
+    async def _request(self, query):
+        return await self.client.post(self.endpoint, headers={"X-API-KEY": self.api_key}, json={"q": query, "num": self.num_results})
+
+    def _parse(self, data):
+        return [_result(item) for item in data.get("organic", [])]
+
+class FakeSearchProvider(SearchProvider):
+    """Offline canned results for tests and benchmarks. Answers after `latency` (+ up to `jitter`) seconds;
+    `tail_rate` of calls take `tail_latency` instead and `fail_rate` of calls raise."""
+    metered = False
+
+    def __init__(self, name: str = "fake", latency: float = 0.0, jitter: float = 0.0, tail_rate: float = 0.0,
+                 tail_latency: float = 2.0, fail_rate: float = 0.0, num_results: int = 5, **_):
+        super().__init__(name, endpoint=None, num_results=num_results)
+        self.latency, self.jitter = latency, jitter
+        self.tail_rate, self.tail_latency = tail_rate, tail_latency
+        self.fail_rate = fail_rate
+        self.calls = 0
+
+    async def search(self, query: str) -> list:
+        self.calls += 1
+        slow = random.random() < self.tail_rate
+        await asyncio.sleep(self.tail_latency if slow else self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.fail_rate: raise SearchError(f"{self.name}: injected failure")
+        return [
+            {"title": f"{self.name} result {i} for {query}", "snippet": f"{query}: figure {zlib.crc32(f'{query}{i}'.encode()) % 1000}M.", "link": f"https://example.com/{i}"}
+            for i in range(self.num_results)
+        ]
+
+PROVIDERS = {"serpapi": SerpApiProvider, "serper": SerperProvider, "fake": FakeSearchProvider}
+
+def build_providers(settings: dict, client) -> list:
+    """Providers from tools.search_providers, in order. `type` defaults to the entry's name; entries whose
+    `api_key_env` isn't set are skipped."""
+    providers = []
+    for name, opts in (settings or {}).items():
+        opts = dict(opts or {})
+        cls = PROVIDERS.get(opts.pop("type", name))
+        if cls is None:
+            logger.warning(f"⚠️ Unknown search provider type for '{name}', skipping")
+            continue
+        env = opts.pop("api_key_env", None)
+        key = os.getenv(env) if env else None
+        if cls.metered and not key:
+            logger.info(f"Search provider '{name}' skipped: {env or 'api_key_env'} not set")
+            continue
+        providers.append(cls(name, api_key=key, client=client, **opts))
+    return providers
+
+class LatencyStats:
+    """Rolling latencies of one provider's answers plus outcome counts."""
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.counts = {"ok": 0, "errors": 0, "timeouts": 0}
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self.counts["ok"] += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.samples: return 0.0
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def to_dict(self) -> dict:
+        return {
+            **self.counts, "samples": len(self.samples),
+            **{f"p{int(q * 100)}_ms": round(self.quantile(q) * 1000, 1) for q in (0.5, 0.9, 0.99)},
+        }
+
+class SearchService:
+    """Web search over an ordered list of providers.
+
+    The first provider gets the query. If it hasn't answered within its own p`quantile` latency (or
+    `default_delay` until it has `min_samples` timings), the next provider is asked as well and the first
+    answer wins. A provider that fails or times out (`timeout` seconds) fails over to the next one at once.
+    """
+    def __init__(self, providers: list, timeout: float = 8.0, hedge: bool = True, quantile: float = 0.9,
+                 min_samples: int = 20, default_delay: float = 2.0, rate_limiter=None):
+        self.providers = providers
+        self.timeout = timeout
+        self.hedge = hedge
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.rate_limiter = rate_limiter  # provider name -> limiter with async acquire()
+        self.latency = {p.name: LatencyStats() for p in providers}
+        self.stats = {"queries": 0, "hedged": 0, "backup_wins": 0, "failovers": 0, "failed": 0}
+        self._stragglers = set()
+
+    @property
+    def primary(self):
+        return self.providers[0].name if self.providers else None
+
+    def hedge_delay(self, name: str) -> float:
+        stats = self.latency[name]
+        if len(stats.samples) < self.min_samples: return self.default_delay
+        return stats.quantile(self.quantile)
+
+    async def _call(self, provider, query):
+        if provider.metered and self.rate_limiter: await self.rate_limiter(provider.name).acquire()
+        stats = self.latency[provider.name]
+        with span("search.provider", provider=provider.name) as s:
+            start = time.perf_counter()
+            try:
+                results = await asyncio.wait_for(provider.search(query), self.timeout)
+            except asyncio.TimeoutError:
+                stats.counts["timeouts"] += 1
+                stats.samples.append(self.timeout)  # censored at the timeout, but it belongs in the tail
+                raise SearchError(f"{provider.name} timed out after {self.timeout}s")
+            except SearchError:
+                stats.counts["errors"] += 1
+                raise
+            except Exception as e:
+                stats.counts["errors"] += 1
+                raise SearchError(f"{provider.name}: {e}") from e
+            stats.record(time.perf_counter() - start)
+            s.set(results=len(results))
+            return results
+
+    async def search(self, query: str) -> tuple:
+        """(provider name, results) from the first provider to answer. Raises SearchError if all fail."""
+        if not self.providers: raise SearchError("No search provider configured")
+        self.stats["queries"] += 1
+        waiting = list(self.providers)
+        pending, started, errors = {}, {}, []
+
+        def launch():
+            provider = waiting.pop(0)
+            task = asyncio.ensure_future(self._call(provider, query))
+            pending[task], started[task] = provider, time.monotonic()
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and waiting and len(pending) == 1:
+                    (task, provider), = pending.items()
+                    timeout = max(0.0, started[task] + self.hedge_delay(provider.name) - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than this provider usually is: race the next one instead of waiting out the tail
+                    self.stats["hedged"] += 1
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        results = task.result()
+                    except SearchError as e:
+                        logger.warning(f"⚠️ Search provider failed: {e}")
+                        errors.append(str(e))
+                        continue
+                    if provider is not self.providers[0]: self.stats["backup_wins"] += 1
+                    return provider.name, results
+                if not pending and waiting:
+                    self.stats["failovers"] += 1
+                    launch()
+            self.stats["failed"] += 1
+            raise SearchError("; ".join(errors))
+        finally:
+            # Losers run to completion (bounded by `timeout`) so their latency still lands in the p90 estimate
+            for task in pending:
+                self._stragglers.add(task)
+                task.add_done_callback(self._discard)
+
+    def _discard(self, task):
+        self._stragglers.discard(task)
+        if not task.cancelled(): task.exception()  # retrieved: a losing provider's error isn't worth a warning
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "providers": {name: s.to_dict() for name, s in self.latency.items()}}
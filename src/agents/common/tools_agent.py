@@ -1,8 +1,9 @@
-import os
-import json
-import requests
-from qdrant_client import QdrantClient
+import asyncio
 from src.utils.utils import load_config, sanitize_url
+from src.utils.container import get_container
+from src.agents.common.search_providers import SearchError
+from src.memory.memory_manager import MemoryManager
+from src.utils.tracing import span, record_cache
 from config.logger_config import get_logger, WorkNotesManager
 
 logger = get_logger("tools")
@@ -10,80 +11,72 @@ config = load_config()
 
 class ToolsAgent:
     def __init__(self):
-        self.serper_key = os.getenv("SERPER_API_KEY") or os.getenv("SERPAPI_API_KEY")
-        self.endpoint = config['tools']['serper_api_endpoint']
-        
-        self.qdrant = QdrantClient(
-            host=config['memory']['qdrant_host'], 
-            port=config['memory']['qdrant_port']
-        )
+        self.search = get_container().search
+        # Results are cached under the primary provider whichever provider answered
+        self.provider = self.search.primary
+        self.cache = get_container().search_cache
+        self.memory = MemoryManager()
 
     async def search_web(self, notes: WorkNotesManager, query: str):
+        with span("tool.search_web", provider=self.provider) as s:
+            text, results = await self._search_web(notes, query)
+            s.set(results=len(results), bytes=len(text.encode("utf-8")))
+            return text, results
+
+    async def _search_web(self, notes, query):
         notes.add_note("Tools", f"Searching Web: {query}")
         
-        if not self.serper_key:
+        if not self.search.providers:
             notes.add_note("Tools", "Error: No API Key found.")
             return "", []
 
-        try:
-            data = {}
-            results = []
-            
-            # CASE A: SERPAPI (The 7716... key)
-            if "serpapi.com" in self.endpoint:
-                logger.info(f"Using SerpApi Mode for query: {query}")
-                params = {"api_key": self.serper_key, "q": query, "engine": "google"}
-                resp = requests.get(self.endpoint, params=params)
-                data = resp.json()
-                if 'organic_results' in data:
-                    for item in data['organic_results'][:5]:
-                        results.append({
-                            "title": item.get("title"),
-                            "snippet": item.get("snippet"),
-                            "link": item.get("link")
-                        })
+        cached = await self.cache.get(self.provider, query)
+        record_cache("search", bool(cached))
+        if cached:
+            notes.add_note("Tools", "Search cache hit.")
+            return cached
 
-            # CASE B: SERPER.DEV (The gl-... key)
-            else:
-                headers = {'X-API-KEY': self.serper_key, 'Content-Type': 'application/json'}
-                resp = requests.post(self.endpoint, headers=headers, data=json.dumps({"q": query, "num": 5}))
-                data = resp.json()
-                if 'organic' in data:
-                    for item in data['organic']:
-                        results.append({
-                            "title": item.get("title"),
-                            "snippet": item.get("snippet"),
-                            "link": item.get("link")
-                        })
-
-            if not results:
-                logger.warning(f"Search returned 0 results.")
-                return "", []
-
-            evidence_text = "\n".join([f"[Web - {r['title']}]: {r['snippet']}" for r in results])
-            return evidence_text, results
-            
-        except Exception as e:
+        try:
+            provider, results = await self.search.search(query)
+        except SearchError as e:
             logger.error(f"Search Exception: {e}")
             notes.add_note("Tools", f"Web Search Exception: {e}")
             return "", []
 
-    async def recall_memory(self, notes: WorkNotesManager, url: str, query: str):
+        if provider != self.provider:
+            notes.add_note("Tools", f"Answered by {provider}")
+        if not results:
+            logger.warning(f"Search returned 0 results.")
+            return "", []
+
+        evidence_text = "\n".join([f"[Web - {r['title']}]: {r['snippet']}" for r in results])
+        await self.cache.set(self.provider, query, (evidence_text, results))
+        return evidence_text, results
+
+    async def recall_memory(self, notes: WorkNotesManager, url: str, query: str, source=None, crawl_id=None):
+        """`source` / `crawl_id` (a value or a list) restrict recall to those pages or crawls."""
+        with span("tool.recall_memory") as s:
+            text, meta = await self._recall_memory(notes, url, query, source, crawl_id)
+            s.set(hits=len(meta), bytes=len(text.encode("utf-8")))
+            return text, meta
+
+    async def _recall_memory(self, notes, url, query, source, crawl_id):
         col_name = sanitize_url(url)
-        if not self.qdrant.collection_exists(col_name):
+        if not await asyncio.to_thread(self.memory.qdrant.collection_exists, col_name):
             notes.add_note("Tools", f"No internal memory found for {col_name}")
             return "", []
             
-        notes.add_note("Tools", f"Checking Qdrant: {col_name}")
+        scope = ", ".join(f"{k}={v}" for k, v in (("source", source), ("crawl_id", crawl_id)) if v)
+        notes.add_note("Tools", f"Checking Qdrant: {col_name}" + (f" ({scope})" if scope else ""))
         try:
-            res = self.qdrant.query(collection_name=col_name, query_text=query, limit=3)
+            res = await self.memory.asearch(url, query, 3, source, crawl_id) or []
             evidence = []
             meta = []
             for r in res:
-                doc = r.metadata.get('document') or r.metadata.get('text')
+                doc = r.get('document') or r.get('text')
                 if doc:
                     evidence.append(f"[Internal Report]: {doc}")
-                    meta.append(r.metadata)
+                    meta.append(r)
             
             return "\n".join(evidence), meta
         except Exception as e:
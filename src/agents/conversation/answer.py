@@ -1,13 +1,31 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
+from src.utils.streaming import JsonFieldStreamer
+from src.utils.context import pack_context, pack_history
+from src.memory.session_store import summary_line, turn_lines
 
 class AnswerAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
-    async def generate(self, wn, query, evidence):
+    @traced("agent.answer")
+    async def generate(self, wn, query, evidence=None, history=None):
+        """Answers from `evidence`, or for CHAT turns from the conversation `history` ({"summary", "turns"})."""
         wn.add_note("Answer", "Synthesizing...")
+        if history is not None:
+            header = "\n".join(filter(None, ["Chat History:", summary_line(history)]))
+            evidence = pack_history("answer", header, turn_lines(history), wn)
+        else:
+            evidence = pack_context("answer", evidence, query, wn)
         sys = self.prompts['answer_generator'].format(query=query, evidence=evidence)
-        res = self.llm.chat(sys, "Answer", json_mode=True)
-        return res.get("final_answer", "Error.")
\ No newline at end of file
+        if wn.streaming: return await self._stream(wn, sys)
+        res = await self.llm.chat(sys, "Answer", json_mode=True)
+        return res.get("final_answer", "Error.")
+
+    async def _stream(self, wn, sys):
+        field = JsonFieldStreamer("final_answer")
+        async for delta in self.llm.stream(sys, "Answer", json_mode=True):
+            text = field.feed(delta)
+            if text: wn.emit("token", {"text": text})
+        return field.result().get("final_answer") or field.value or "Error."
\ No newline at end of file
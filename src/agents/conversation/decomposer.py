@@ -1,19 +1,21 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
 
 class DecomposerAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
+    @traced("agent.decomposer")
     async def decompose(self, wn, query, url):
         wn.add_note("Decomposer", "Splitting query...")
         sys = self.prompts['query_decomposer'].format(query=query, url=url)
-        res = self.llm.chat(sys, "Decompose", json_mode=True)
+        res = await self.llm.chat(sys, "Decompose", json_mode=True)
         return res.get("sub_queries", [query])
 
+    @traced("agent.refiner")
     async def refine(self, wn, original, feedback):
         wn.add_note("Refiner", f"Refining '{original}' due to: {feedback}")
         sys = self.prompts['query_refiner'].format(original=original, feedback=feedback)
-        res = self.llm.chat(sys, "Refine", json_mode=True)
+        res = await self.llm.chat(sys, "Refine", json_mode=True)
         return res.get("refined_queries", [original])
\ No newline at end of file
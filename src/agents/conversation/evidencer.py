@@ -1,5 +1,6 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
+from src.utils.context import pack_context
 from config.logger_config import get_logger
 import json
 
@@ -7,17 +8,19 @@ logger = get_logger("evidencer")
 
 class EvidenceAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
+    @traced("agent.evidencer")
     async def analyze(self, wn, query, evidence):
         wn.add_note("Evidencer", "Auditing...")
         if not evidence or not evidence.strip(): 
             return {"sufficient": False, "feedback": "Evidence Empty."}
         
+        evidence = pack_context("gap_analysis", evidence, query, wn)
         sys = self.prompts['gap_analysis'].format(query=query, evidence=evidence)
         try:
-            return self.llm.chat(sys, "Audit", json_mode=True)
+            return await self.llm.chat(sys, "Audit", json_mode=True)
         except Exception as e:
             logger.error(f"Evidencer Error: {e}")
             return {"sufficient": False, "feedback": "Audit crashed."}
\ No newline at end of file
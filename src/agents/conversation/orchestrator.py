@@ -1,5 +1,5 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
 from config.logger_config import get_logger
 import json
 
@@ -7,14 +7,15 @@ logger = get_logger("orchestrator")
 
 class OrchestratorAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
+    @traced("agent.orchestrator")
     async def route(self, wn, query, url):
         wn.add_note("Orchestrator", f"Routing: {query}")
         sys = self.prompts['orchestrator'].format(query=query, url=url)
         try:
-            return self.llm.chat(sys, query, json_mode=True)
+            return await self.llm.chat(sys, query, json_mode=True)
         except Exception as e:
             logger.error(f"Orchestrator Error: {e}")
             return {"decision": "RECALL", "query": query, "thought": "Fallback error"}
\ No newline at end of file
@@ -0,0 +1,98 @@
+import asyncio
+import re
+import numpy as np
+from src.utils.container import get_container
+from src.utils.utils import load_config, load_routes
+from src.utils.tracing import span
+from config.logger_config import get_logger
+
+logger = get_logger("router")
+config = load_config()
+
+NORMALIZE = re.compile(r"[^\w\s]")
+
+class IntentRouter:
+    """Fast-path CHAT/RECALL/SEARCH routing by embedding similarity to the labelled examples in config/routes.yaml.
+
+    Each label scores the mean similarity of its `k` nearest examples. A message is routed locally only when
+    the best label clears `min_similarity` and beats the runner-up by `min_margin`; otherwise `route` returns
+    None and the caller asks the LLM orchestrator.
+    """
+    def __init__(self, min_similarity: float = 0.82, min_margin: float = 0.04, k: int = 3):
+        self._container = get_container()
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.k = k
+        self.labels = None  # label per example row
+        self.matrix = None  # L2-normalised example embeddings
+        self.exact = {}     # normalised example text -> label
+        self._ready = None
+        self.router_disabled = False  # the model failed to load: every message goes to the LLM
+        self.stats = {"fast": 0, "fallback": 0}
+
+    @staticmethod
+    def _unit(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+    def _embed(self, texts):
+        return self._unit(list(self._container.embedder.embed(texts)))
+
+    def _build(self):
+        texts, labels = [], []
+        for label, examples in load_routes().items():
+            for text in examples:
+                texts.append(text)
+                labels.append(label)
+                self.exact[self._normalize(text)] = label
+        self.matrix = self._embed(texts)
+        self.labels = np.array(labels)
+        logger.info(f"🧭 Router ready: {len(texts)} examples across {len(set(labels))} routes")
+
+    async def warmup(self):
+        """Embeds the examples once; concurrent callers wait on the same build. False if the model can't load."""
+        if self.router_disabled: return False
+        if self._ready is None:
+            self._ready = asyncio.get_running_loop().run_in_executor(self._container.executor, self._build)
+        try:
+            await asyncio.shield(self._ready)
+            return True
+        except Exception as e:
+            if not self.router_disabled:
+                self.router_disabled = True
+                logger.warning(f"Fast-path router disabled: {e}")
+            return False
+
+    @staticmethod
+    def _normalize(text):
+        return " ".join(NORMALIZE.sub(" ", text.lower()).split())
+
+    def classify(self, vector) -> tuple:
+        """(label, score, margin) for one normalised query vector."""
+        sims = self.matrix @ vector
+        scores = {}
+        for label in set(self.labels.tolist()):
+            top = np.sort(sims[self.labels == label])[-self.k:]
+            scores[label] = float(top.mean())
+        ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+        best, score = ranked[0]
+        return best, score, score - (ranked[1][1] if len(ranked) > 1 else 0.0)
+
+    async def route(self, wn, query):
+        """Same shape as OrchestratorAgent.route, or None when the LLM should decide."""
+        with span("router.fast_path") as s:
+            if not await self.warmup(): return None
+            label = self.exact.get(self._normalize(query))
+            if label:
+                score, margin = 1.0, 1.0
+            else:
+                # Passage-style like the examples, batched with other requests' embeddings
+                dense, _ = await self._container.embeddings.documents([query], sparse=False)
+                vector = self._unit(dense)[0]
+                label, score, margin = self.classify(vector)
+            confident = score >= self.min_similarity and margin >= self.min_margin
+            s.set(label=label, score=round(score, 3), margin=round(margin, 3), confident=confident)
+            self.stats["fast" if confident else "fallback"] += 1
+            if not confident: return None
+            wn.add_note("Router", f"Fast path: {label} (similarity {score:.2f}, margin {margin:.2f})")
+            return {"decision": label, "query": query, "thought": f"Nearest labelled examples ({score:.2f})", "router": "embedding"}
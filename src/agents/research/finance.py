@@ -1,16 +1,35 @@
+import asyncio
+import time
 from src.agents.common.tools_agent import ToolsAgent
-from src.utils.llm_client import LLMClient
+from src.utils.container import get_container
+from src.utils.tracing import traced
+from src.utils.utils import load_config
+
+config = load_config()
 
 class BaseResearcher:
     def __init__(self, role):
         self.role = role
         self.tools = ToolsAgent()
-        self.llm = LLMClient()
+        self.llm = get_container().llm
+        # Whole-query deadline; each provider request has its own, shorter search_timeout so failover fits inside
+        self.timeout = config['tools'].get('query_timeout', 20)
+
+    async def _timed_search(self, wn, query):
+        start = time.perf_counter()
+        try:
+            text, _ = await asyncio.wait_for(self.tools.search_web(wn, query), timeout=self.timeout)
+            outcome = f"{len(text)} chars"
+        except asyncio.TimeoutError:
+            text, outcome = "", "timed out"
+        wn.add_note(self.role, f"'{query}' -> {outcome} in {time.perf_counter() - start:.2f}s")
+        return text
 
+    @traced("agent.researcher")
     async def execute(self, wn, queries):
-        wn.add_note(self.role, f"Running {len(queries)} queries...")
-        data = []
-        for q in queries:
-            text, _ = await self.tools.search_web(wn, q)
-            if text: data.append(text)
-        return "\n".join(data)
\ No newline at end of file
+        wn.add_note(self.role, f"Running {len(queries)} queries in parallel...")
+        start = time.perf_counter()
+        # gather keeps results in query order regardless of completion order
+        texts = await asyncio.gather(*(self._timed_search(wn, q) for q in queries))
+        wn.add_note(self.role, f"Fan-out finished in {time.perf_counter() - start:.2f}s")
+        return "\n".join(t for t in texts if t)
@@ -1,15 +1,16 @@
-from src.utils.llm_client import LLMClient
+from src.utils.container import get_container
+from src.utils.tracing import traced
 from src.agents.common.crawler_agent import CrawlerAgent
-from src.utils.utils import load_prompts
 
 class ScoutAgent:
     def __init__(self):
-        self.llm = LLMClient()
+        self.llm = get_container().llm
         self.crawler = CrawlerAgent()
-        self.prompts = load_prompts()
+        self.prompts = get_container().prompts
 
+    @traced("agent.scout")
     async def analyze(self, wn, url):
         wn.add_note("Scout", f"Crawling {url}...")
         text = await self.crawler.fetch_page(url)
         if not text: return "Generic Context (Site Unreachable)"
-        return self.llm.chat(self.prompts['scout'].format(text=text[:4000]), "Analyze")
\ No newline at end of file
+        return await self.llm.chat(self.prompts['scout'].format(text=text[:4000]), "Analyze")
\ No newline at end of file
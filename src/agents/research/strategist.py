@@ -1,11 +1,12 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
 
 class StrategistAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
+    @traced("agent.strategist")
     async def plan(self, wn, context, url):
         wn.add_note("Strategist", "Generating Plan...")
-        return self.llm.chat(self.prompts['strategist'].format(context=context, url=url), "Plan", json_mode=True)
\ No newline at end of file
+        return await self.llm.chat(self.prompts['strategist'].format(context=context, url=url), "Plan", json_mode=True)
\ No newline at end of file
@@ -1,12 +1,22 @@
-from src.utils.llm_client import LLMClient
-from src.utils.utils import load_prompts
+from src.utils.container import get_container
+from src.utils.tracing import traced
+from src.utils.context import pack_context
 import json
 
 class WriterAgent:
     def __init__(self):
-        self.llm = LLMClient()
-        self.prompts = load_prompts()
+        self.llm = get_container().llm
+        self.prompts = get_container().prompts
 
+    @traced("agent.writer")
     async def write(self, wn, url, data):
         wn.add_note("Writer", "Writing Report...")
-        return self.llm.chat(self.prompts['writer'].format(url=url, data=json.dumps(data)), "Write")
\ No newline at end of file
+        # Search results arrive in query order (finance/marketing interleaved), which is the order worth keeping
+        data = pack_context("writer", data if isinstance(data, str) else json.dumps(data), wn=wn)
+        sys = self.prompts['writer'].format(url=url, data=data)
+        if not wn.streaming: return await self.llm.chat(sys, "Write")
+        parts = []
+        async for delta in self.llm.stream(sys, "Write"):
+            parts.append(delta)
+            wn.emit("token", {"text": delta})
+        return "".join(parts)
\ No newline at end of file
@@ -0,0 +1,242 @@
+import time
+import uuid
+import asyncio
+from urllib.parse import urlparse
+from redis.exceptions import WatchError
+from config.logger_config import get_logger
+from src.utils.locks import acquire_lock, release_lock
+
+logger = get_logger("jobs")
+
+PROGRESS_FIELDS = ("pages_queued", "pages_fetched", "pages_rendered", "pages_indexed", "bytes", "errors")
+TERMINAL = ("done", "failed", "cancelled")
+
+def crawl_domain(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+def new_job(job_id, url):
+    return {
+        "id": job_id, "url": url, "domain": crawl_domain(url), "status": "queued",
+        "created_at": time.time(), "started_at": None, "finished_at": None, "error": None,
+        "cancel_requested": False, **{f: 0 for f in PROGRESS_FIELDS}
+    }
+
+def present(job):
+    """API shape: counters grouped under `progress`."""
+    if job is None: return None
+    out = {k: v for k, v in job.items() if k not in PROGRESS_FIELDS}
+    out["progress"] = {f: job.get(f, 0) for f in PROGRESS_FIELDS}
+    return out
+
+class MemoryJobQueue:
+    """Single-process stand-in for RedisJobQueue; workers must run inside the same process (tests, dev)."""
+    def __init__(self):
+        self.jobs = {}
+        self.pending = asyncio.Queue()
+        self.domains = {}
+        self.active = {}  # domain -> id of its latest crawl
+
+    async def enqueue(self, job_id, url):
+        self.jobs[job_id] = new_job(job_id, url)
+        await self.pending.put(job_id)
+        return present(self.jobs[job_id])
+
+    async def enqueue_unique(self, job_id, url):
+        holder = self.jobs.get(self.active.get(crawl_domain(url)))
+        if holder and holder["status"] not in TERMINAL: return present(holder)
+        self.active[crawl_domain(url)] = job_id
+        return await self.enqueue(job_id, url)
+
+    async def requeue(self, job_id): await self.pending.put(job_id)
+
+    async def next_job(self, timeout: float):
+        try: job_id = await asyncio.wait_for(self.pending.get(), timeout)
+        except asyncio.TimeoutError: return None
+        return self.jobs.get(job_id)
+
+    # Workers share this process, so none can die while still holding a job
+    async def ack(self, job_id): pass
+
+    async def heartbeat(self): pass
+
+    async def recover(self): return []
+
+    async def get(self, job_id): return present(self.jobs.get(job_id))
+
+    async def update(self, job_id, **fields):
+        if job_id in self.jobs: self.jobs[job_id].update(fields)
+
+    async def incr(self, job_id, field, n=1):
+        if job_id in self.jobs: self.jobs[job_id][field] += n
+
+    async def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None: return None
+        if job["status"] == "queued": job.update(status="cancelled", finished_at=time.time())
+        elif job["status"] not in TERMINAL: job["cancel_requested"] = True
+        return present(job)
+
+    async def is_cancel_requested(self, job_id):
+        return self.jobs.get(job_id, {}).get("cancel_requested", False)
+
+    async def acquire_domain(self, domain, limit):
+        if self.domains.get(domain, 0) >= limit: return False
+        self.domains[domain] = self.domains.get(domain, 0) + 1
+        return True
+
+    async def release_domain(self, domain):
+        self.domains[domain] = max(0, self.domains.get(domain, 0) - 1)
+
+class RedisJobQueue:
+    """Crawl jobs shared by the API and any number of worker processes.
+
+    crawl:queue is a list of pending job ids, crawl:job:<id> a hash with status and counters,
+    crawl:domain:<domain> the number of crawls currently running for that domain.
+
+    A worker takes a job by moving its id into its own crawl:processing:<worker> list and removes it only
+    once the job is finished (`ack`). While alive it refreshes crawl:worker:<worker> every few seconds; when
+    that key expires the worker is presumed dead and `recover` puts its jobs back on the queue.
+    """
+    QUEUE = "crawl:queue"
+    PROCESSING = "crawl:processing:"
+    WORKER = "crawl:worker:"
+
+    def __init__(self, redis, job_ttl: int = 604800, worker_ttl: int = 30):
+        self.redis = redis
+        self.job_ttl = job_ttl
+        self.worker_ttl = worker_ttl
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.processing = f"{self.PROCESSING}{self.worker_id}"
+
+    def _key(self, job_id): return f"crawl:job:{job_id}"
+
+    @staticmethod
+    def _encode(fields):
+        return {k: "" if v is None else str(int(v) if isinstance(v, bool) else v) for k, v in fields.items()}
+
+    @staticmethod
+    def _decode(raw):
+        if not raw: return None
+        job = dict(raw)
+        for f in PROGRESS_FIELDS: job[f] = int(job.get(f, 0))
+        for f in ("created_at", "started_at", "finished_at"): job[f] = float(job[f]) if job.get(f) else None
+        job["cancel_requested"] = job.get("cancel_requested") == "1"
+        job["error"] = job.get("error") or None
+        return job
+
+    async def enqueue(self, job_id, url):
+        job = new_job(job_id, url)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(job_id), mapping=self._encode(job))
+            pipe.expire(self._key(job_id), self.job_ttl)
+            pipe.rpush(self.QUEUE, job_id)
+            await pipe.execute()
+        return present(job)
+
+    async def enqueue_unique(self, job_id, url):
+        """Enqueues unless a crawl of the same domain is queued or running; returns whichever job covers the domain.
+
+        crawl:active:<domain> points at the domain's latest crawl. It is replaced under WATCH, so of several
+        API processes racing for an idle domain exactly one enqueues.
+        """
+        key = f"crawl:active:{crawl_domain(url)}"
+        while True:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(key)
+                    holder = await pipe.get(key)
+                    job = await self.get(holder) if holder else None
+                    if job and job["status"] not in TERMINAL: return job
+                    job = new_job(job_id, url)
+                    pipe.multi()
+                    pipe.set(key, job_id, ex=self.job_ttl)
+                    pipe.hset(self._key(job_id), mapping=self._encode(job))
+                    pipe.expire(self._key(job_id), self.job_ttl)
+                    pipe.rpush(self.QUEUE, job_id)
+                    await pipe.execute()
+                    return present(job)
+                except WatchError:
+                    continue
+
+    async def requeue(self, job_id):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing, 1, job_id)
+            pipe.rpush(self.QUEUE, job_id)
+            await pipe.execute()
+
+    async def next_job(self, timeout: float):
+        start = time.monotonic()
+        job_id = await self.redis.blmove(self.QUEUE, self.processing, max(1, int(timeout)), "LEFT", "RIGHT")
+        if not job_id:
+            # Some Redis stand-ins (fakeredis) answer an empty BLMOVE at once instead of blocking: don't spin
+            await asyncio.sleep(max(0.0, timeout - (time.monotonic() - start)))
+            return None
+        job = self._decode(await self.redis.hgetall(self._key(job_id)))
+        if job is None: await self.ack(job_id)  # expired while queued
+        return job
+
+    async def ack(self, job_id):
+        """The job reached a final state (or was skipped): this worker no longer holds it."""
+        await self.redis.lrem(self.processing, 1, job_id)
+
+    async def heartbeat(self):
+        await self.redis.set(f"{self.WORKER}{self.worker_id}", time.time(), ex=self.worker_ttl)
+
+    async def recover(self):
+        """Requeues the jobs of workers whose heartbeat expired; returns their ids. A job that was running
+        goes back to "queued" (or "cancelled" if that was requested) and gives back its domain slot."""
+        token = await acquire_lock(self.redis, "crawl:recover", self.worker_ttl)
+        if not token: return []  # another worker is recovering right now
+        recovered = []
+        try:
+            async for key in self.redis.scan_iter(match=f"{self.PROCESSING}*"):
+                if await self.redis.exists(f"{self.WORKER}{key[len(self.PROCESSING):]}"): continue
+                while (job_id := await self.redis.lindex(key, 0)) is not None:
+                    job = self._decode(await self.redis.hgetall(self._key(job_id)))
+                    if job and job["status"] == "running":
+                        if job["cancel_requested"]:
+                            await self.update(job_id, status="cancelled", finished_at=time.time())
+                        else:
+                            await self.update(job_id, status="queued", started_at=None)
+                        await self.release_domain(job["domain"])
+                    # Status first, then the move: a worker that picks the id up must already see it queued
+                    await self.redis.lmove(key, self.QUEUE, "LEFT", "RIGHT")
+                    recovered.append(job_id)
+        finally:
+            await release_lock(self.redis, "crawl:recover", token)
+        if recovered: logger.warning(f"♻️ Requeued {len(recovered)} crawl job(s) from dead workers: {recovered}")
+        return recovered
+
+    async def get(self, job_id):
+        return present(self._decode(await self.redis.hgetall(self._key(job_id))))
+
+    async def update(self, job_id, **fields):
+        await self.redis.hset(self._key(job_id), mapping=self._encode(fields))
+
+    async def incr(self, job_id, field, n=1):
+        await self.redis.hincrby(self._key(job_id), field, n)
+
+    async def cancel(self, job_id):
+        job = self._decode(await self.redis.hgetall(self._key(job_id)))
+        if job is None: return None
+        if job["status"] == "queued":
+            await self.update(job_id, status="cancelled", finished_at=time.time())
+        elif job["status"] not in TERMINAL:
+            await self.update(job_id, cancel_requested=True)
+        return await self.get(job_id)
+
+    async def is_cancel_requested(self, job_id):
+        return await self.redis.hget(self._key(job_id), "cancel_requested") == "1"
+
+    async def acquire_domain(self, domain, limit):
+        key = f"crawl:domain:{domain}"
+        if await self.redis.incr(key) > limit:
+            await self.redis.decr(key)
+            return False
+        # Safety net: a worker killed mid-crawl must not block the domain forever
+        await self.redis.expire(key, 3600)
+        return True
+
+    async def release_domain(self, domain):
+        key = f"crawl:domain:{domain}"
+        if await self.redis.decr(key) <= 0: await self.redis.delete(key)
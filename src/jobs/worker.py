@@ -0,0 +1,140 @@
+import time
+import asyncio
+import argparse
+import multiprocessing
+from config.logger_config import get_logger
+from src.jobs.queue import crawl_domain
+from src.utils.container import get_container
+from src.utils.utils import load_config
+
+logger = get_logger("crawl_worker")
+config = load_config()
+
+class CrawlWorker:
+    """Pulls crawl jobs off the queue and runs them, at most `max_concurrent` at a time in this
+    process and `max_per_domain` per domain across every worker sharing the queue."""
+    def __init__(self, jobs, max_concurrent: int = 2, max_per_domain: int = 1, poll_interval: float = 1.0):
+        self.jobs = jobs
+        self.max_concurrent = max_concurrent
+        self.max_per_domain = max_per_domain
+        self.poll_interval = poll_interval
+        self._tasks = set()
+        self._crawler = None
+
+    async def _heartbeat(self):
+        """Keeps this worker's jobs claimed and picks up the jobs of workers that died holding some."""
+        interval = max(1.0, getattr(self.jobs, "worker_ttl", 30) / 3)
+        while True:
+            try:
+                await self.jobs.heartbeat()
+                await self.jobs.recover()
+            except Exception as e:
+                logger.warning(f"Worker heartbeat failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def run(self):
+        slots = asyncio.Semaphore(self.max_concurrent)
+        logger.info(f"👷 Crawl worker up ({self.max_concurrent} slots, {self.max_per_domain}/domain)")
+        # First beat (and recovery of crashed workers' jobs) before taking anything off the queue
+        await self.jobs.heartbeat()
+        await self.jobs.recover()
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while True:
+                await slots.acquire()
+                job = await self.jobs.next_job(timeout=self.poll_interval)
+                if job is None:
+                    slots.release()
+                    continue
+                if job["status"] != "queued":
+                    # Cancelled while queued, or a finished job requeued by recovery
+                    await self.jobs.ack(job["id"])
+                    slots.release()
+                    continue
+                if not await self.jobs.acquire_domain(job["domain"], self.max_per_domain):
+                    # Domain busy elsewhere: put it back and give other jobs a turn
+                    await self.jobs.requeue(job["id"])
+                    slots.release()
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                task = asyncio.create_task(self._run_job(job, slots))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            heartbeat.cancel()
+            for t in list(self._tasks): t.cancel()
+            await asyncio.gather(heartbeat, *self._tasks, return_exceptions=True)
+
+    @property
+    def crawler(self):
+        # One agent for every job: all per-crawl state lives in its CrawlRun/CrawlFrontier
+        if self._crawler is None:
+            from src.agents.common.crawler_agent import CrawlerAgent
+            self._crawler = CrawlerAgent()
+        return self._crawler
+
+    async def _run_job(self, job, slots):
+        job_id, crawl, handed_back = job["id"], None, False
+        try:
+            await self.jobs.update(job_id, status="running", started_at=time.time())
+            progress = lambda field, n=1: self.jobs.incr(job_id, field, n)
+            crawl = asyncio.create_task(self.crawler.deep_crawl(job["url"], job_id, progress=progress))
+            while not crawl.done():
+                await asyncio.wait({crawl}, timeout=self.poll_interval)
+                if not crawl.done() and await self.jobs.is_cancel_requested(job_id):
+                    logger.info(f"🛑 Cancelling crawl {job_id}")
+                    crawl.cancel()
+            await crawl
+            await self.jobs.update(job_id, status="done", finished_at=time.time())
+        except asyncio.CancelledError:
+            # A requested cancel ends the crawl first; anything else is this worker shutting down mid-wait
+            shutdown = crawl is None or not crawl.done()
+            if shutdown and crawl is not None:
+                crawl.cancel()
+                await asyncio.gather(crawl, return_exceptions=True)
+            if await self.jobs.is_cancel_requested(job_id):
+                await self.jobs.update(job_id, status="cancelled", finished_at=time.time())
+            elif shutdown:
+                # Hand the crawl back rather than lose it
+                await self.jobs.update(job_id, status="queued", started_at=None)
+                await self.jobs.requeue(job_id)
+                handed_back = True
+            if shutdown: raise
+        except Exception as e:
+            logger.error(f"Crawl {job_id} failed: {e}")
+            await self.jobs.update(job_id, status="failed", error=str(e), finished_at=time.time())
+        finally:
+            if not handed_back: await self.jobs.ack(job_id)
+            await self.jobs.release_domain(crawl_domain(job["url"]))
+            slots.release()
+
+def build_worker(jobs=None) -> CrawlWorker:
+    settings = config.get('jobs', {})
+    return CrawlWorker(
+        jobs or get_container().jobs,
+        max_concurrent=settings.get('max_concurrent', 2),
+        max_per_domain=settings.get('max_per_domain', 1)
+    )
+
+async def _serve():
+    container = get_container()
+    await container.browser_pool.start()
+    try: await build_worker().run()
+    finally: await container.aclose()
+
+def _serve_process():
+    try: asyncio.run(_serve())
+    except KeyboardInterrupt: pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run deep-crawl workers against the Redis job queue.")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+    if config.get('jobs', {}).get('backend', 'redis') != 'redis':
+        raise SystemExit("Standalone workers need jobs.backend: redis")
+    procs = [multiprocessing.Process(target=_serve_process, name=f"crawl-worker-{i}") for i in range(args.processes)]
+    for p in procs: p.start()
+    try:
+        for p in procs: p.join()
+    except KeyboardInterrupt:
+        for p in procs: p.join()
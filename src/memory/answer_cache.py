@@ -0,0 +1,92 @@
+import re
+import time
+import uuid
+import asyncio
+from qdrant_client import models
+from config.logger_config import get_logger
+from src.utils.utils import sanitize_url
+from src.utils.container import get_container
+from src.utils.tracing import record_cache
+from src.memory.vectors import DENSE_VECTOR, dense_params
+
+logger = get_logger("answer_cache")
+
+# Words that point back into the conversation ("tell me more about that", "why did it drop?")
+ANAPHORA = re.compile(r"\b(it|its|this|that|these|those|he|she|him|her|his|more|elaborate|else|above|previous|earlier|again|same)\b", re.I)
+
+def answers_collection(col_name: str) -> str:
+    return f"{col_name}__answers"
+
+class SemanticAnswerCache:
+    """Per-URL cache of finished chat answers, looked up by embedding similarity of the question.
+
+    Lives in its own `<collection>__answers` Qdrant collection, which MemoryManager drops whenever
+    that URL's knowledge changes, so answers never outlive the evidence they were built from. Entries
+    are keyed on the question alone, so follow-ups that lean on the conversation are kept out.
+    """
+    def __init__(self, threshold: float = 0.92, ttl: int = 604800, min_standalone_words: int = 5, live_ttl: int = 900):
+        container = get_container()
+        self.qdrant = container.qdrant
+        self._container = container
+        self.threshold = threshold
+        self.ttl = ttl
+        self.live_ttl = live_ttl  # answers to live-data (SEARCH-routed) questions: prices, news
+        self.min_standalone_words = min_standalone_words
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0}
+
+    def cacheable(self, message, history=None) -> bool:
+        """False for a short or anaphoric message in a session that already has turns: its answer depends
+        on that session, so it is neither looked up nor stored."""
+        if not history or not (history.get("turns") or history.get("summary")): return True
+        if len(message.split()) < self.min_standalone_words or ANAPHORA.search(message):
+            self.stats["skipped"] += 1
+            return False
+        return True
+
+    async def _embed(self, text):
+        # Same memoized query vector recall will use for this question
+        return (await self._container.embeddings.query(text))[0]
+
+    async def lookup(self, url, message):
+        col_name = answers_collection(sanitize_url(url))
+        try:
+            if not await asyncio.to_thread(self.qdrant.collection_exists, col_name):
+                self.stats["misses"] += 1
+                record_cache("answers", False)
+                return None
+            vector = await self._embed(message)
+            res = (await asyncio.to_thread(
+                self.qdrant.query_points, collection_name=col_name, query=vector,
+                using=DENSE_VECTOR, limit=1, score_threshold=self.threshold
+            )).points
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+        if not res or time.time() - res[0].payload.get("created_at", 0) > res[0].payload.get("ttl", self.ttl):
+            self.stats["misses"] += 1
+            record_cache("answers", False)
+            return None
+        self.stats["hits"] += 1
+        record_cache("answers", True)
+        return {**res[0].payload, "score": res[0].score}
+
+    async def store(self, url, message, answer, trace, live: bool = False):
+        """`live` answers (web search for current data) are kept for `live_ttl` seconds only, or not at all if 0."""
+        ttl = self.live_ttl if live else self.ttl
+        if not ttl: return
+        col_name = answers_collection(sanitize_url(url))
+        try:
+            vector = await self._embed(message)
+            if not await asyncio.to_thread(self.qdrant.collection_exists, col_name):
+                await asyncio.to_thread(
+                    self.qdrant.create_collection, collection_name=col_name,
+                    vectors_config=dense_params()
+                )
+            point = models.PointStruct(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{col_name}#{message}")),
+                vector={DENSE_VECTOR: vector},
+                payload={"question": message, "answer": answer, "trace": trace, "created_at": time.time(), "ttl": ttl}
+            )
+            await asyncio.to_thread(self.qdrant.upsert, collection_name=col_name, points=[point])
+        except Exception as e:
+            logger.warning(f"Answer cache store failed: {e}")
@@ -0,0 +1,122 @@
+import asyncio
+from collections import OrderedDict
+from config.logger_config import get_logger
+from src.utils.container import get_container
+from src.memory.vectors import to_sparse
+
+logger = get_logger("embeddings")
+
+class MicroBatcher:
+    """Collects items submitted within `window` seconds (or until `max_batch` are waiting) from any number
+    of callers and runs `fn(items) -> results` on them as one batch in `executor`."""
+    def __init__(self, fn, executor, window: float = 0.005, max_batch: int = 64):
+        self.fn = fn
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = {"batches": 0, "items": 0}
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, items: list) -> list:
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        self._pending.extend(zip(items, futures))
+        if len(self._pending) >= self.max_batch: self._flush()
+        elif self._timer is None: self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.gather(*futures)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch: return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.fn, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done(): future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done(): future.set_result(result)  # done = caller gave up (cancelled)
+
+class EmbeddingService:
+    """Async front for the fastembed models: all inference runs on the container's embedding threads
+    (ONNX releases the GIL), never on the event loop.
+
+    Concurrent query and document requests are micro-batched across requests, and query vectors are
+    memoized per exact query string in an LRU, so the answer cache, the router and recall share one
+    embedding of the same question.
+    """
+    def __init__(self, hybrid: bool = True, window: float = 0.005, max_batch: int = 64, cache_size: int = 4096):
+        self._container = get_container()
+        self.hybrid = hybrid
+        self.cache_size = cache_size
+        executor = self._container.executor
+        self._queries = MicroBatcher(self._embed_queries, executor, window, max_batch)
+        self._dense_docs = MicroBatcher(self._embed_dense, executor, window, max_batch)
+        self._sparse_docs = MicroBatcher(self._embed_sparse, executor, window, max_batch)
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self.stats = {"query_hits": 0, "query_misses": 0}
+
+    # --- executor side ---
+    def _embed_queries(self, texts):
+        dense = [v.tolist() for v in self._container.embedder.query_embed(texts)]
+        if not self.hybrid: return [(d, None) for d in dense]
+        sparse = [to_sparse(e) for e in self._container.sparse_embedder.query_embed(texts)]
+        return list(zip(dense, sparse))
+
+    def _embed_dense(self, docs):
+        return [v.tolist() for v in self._container.embedder.embed(docs, batch_size=len(docs))]
+
+    def _embed_sparse(self, docs):
+        return [to_sparse(e) for e in self._container.sparse_embedder.embed(docs, batch_size=len(docs))]
+
+    # --- loop side ---
+    async def query(self, text: str) -> tuple:
+        """(dense vector, sparse vector or None) for a search query."""
+        if text in self._cache:
+            self._cache.move_to_end(text)
+            self.stats["query_hits"] += 1
+            return self._cache[text]
+        # The same question asked concurrently is embedded once
+        pending = self._inflight.get(text)
+        if pending is not None:
+            self.stats["query_hits"] += 1
+            return await asyncio.shield(pending)
+        self.stats["query_misses"] += 1
+        pending = asyncio.ensure_future(self._queries.submit([text]))
+        self._inflight[text] = pending
+        try:
+            vectors = (await asyncio.shield(pending))[0]
+        finally:
+            self._inflight.pop(text, None)
+        self._cache[text] = vectors
+        while len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+        return vectors
+
+    async def documents(self, docs: list, sparse: bool = None) -> tuple:
+        """(dense vectors, sparse vectors or None) for passages to index; `sparse` defaults to hybrid mode."""
+        if not docs: return [], ([] if sparse or (sparse is None and self.hybrid) else None)
+        if sparse is None: sparse = self.hybrid
+        if not sparse: return await self._dense_docs.submit(docs), None
+        dense, sp = await asyncio.gather(self._dense_docs.submit(docs), self._sparse_docs.submit(docs))
+        return dense, sp
+
+    def get_stats(self) -> dict:
+        batchers = {"queries": self._queries, "documents": self._dense_docs}
+        out = {**self.stats, "cached_queries": len(self._cache)}
+        for name, b in batchers.items():
+            out[f"{name}_batches"] = b.stats["batches"]
+            out[f"{name}_avg_batch"] = round(b.stats["items"] / b.stats["batches"], 2) if b.stats["batches"] else 0
+        return out
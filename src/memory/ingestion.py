@@ -0,0 +1,116 @@
+import asyncio
+from config.logger_config import get_logger
+from src.utils.utils import sanitize_url
+
+logger = get_logger("ingestion")
+
+_STOP = object()
+
+class _Page:
+    """Chunks of one submitted page still waiting for their upsert, and what to run once all have landed."""
+    __slots__ = ("remaining", "failed", "on_indexed")
+
+    def __init__(self, remaining, on_indexed):
+        self.remaining = remaining
+        self.failed = False
+        self.on_indexed = on_indexed
+
+class IngestionPipeline:
+    """Buffers chunks from all crawl workers into size/time-bounded batches, embeds them off the
+    event loop and upserts each batch in one call while the next batch is being embedded.
+
+    `submit` blocks once `max_pending` chunks are waiting, which throttles the crawler to the
+    speed of the embedder instead of letting pages pile up in memory. Its `on_indexed` callback runs
+    only after every chunk of the page was upserted, so nothing that failed is recorded as indexed.
+    """
+    def __init__(self, memory, batch_size: int = 64, flush_interval: float = 1.0, max_pending: int = 256):
+        self.memory = memory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.stats = {"pages": 0, "chunks": 0, "batches": 0, "failed_chunks": 0}
+        self._consumer = None
+        self._upsert = None
+
+    async def __aenter__(self):
+        self._consumer = asyncio.create_task(self._consume())
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def submit(self, url, chunks, metadata_list, on_indexed=None):
+        """Queues one page's chunks; `on_indexed` is an optional async callable run once they are all stored."""
+        col_name = sanitize_url(url)
+        page = _Page(len(chunks), on_indexed)
+        self.stats["pages"] += 1
+        if not chunks: await self._done(page)
+        for doc, meta in zip(chunks, metadata_list):
+            await self.queue.put((col_name, doc, meta, page))
+
+    async def close(self):
+        if self._consumer is None: return
+        await self.queue.put(_STOP)
+        await self._consumer
+        self._consumer = None
+        logger.info(f"💾 Ingestion done: {self.stats}")
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        batch, deadline = [], None
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if batch else None
+            try: item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError: item = None
+
+            if item is _STOP:
+                if batch: await self._flush(batch)
+                if self._upsert: await self._upsert
+                return
+            if item is not None:
+                if not batch: deadline = loop.time() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or loop.time() >= deadline):
+                await self._flush(batch)
+                batch = []
+
+    async def _flush(self, batch):
+        docs = [doc for _, doc, _, _ in batch]
+        try:
+            vectors, sparse = await self.memory.embeddings.documents(docs)
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            self._fail(page for *_, page in batch)
+            return
+        by_collection = {}
+        for (col_name, doc, meta, page), vec, sp in zip(batch, vectors, sparse or [None] * len(vectors)):
+            by_collection.setdefault(col_name, []).append((doc, meta, vec, sp, page))
+        # Keep at most one upsert in flight so embedding of the next batch overlaps with it
+        if self._upsert: await self._upsert
+        self._upsert = asyncio.create_task(self._write(by_collection))
+        self.stats["chunks"] += len(batch)
+        self.stats["batches"] += 1
+
+    async def _write(self, by_collection):
+        for col_name, rows in by_collection.items():
+            pages = [row[-1] for row in rows]
+            try:
+                points = self.memory.build_points(*zip(*(row[:-1] for row in rows)))
+                await asyncio.to_thread(self.memory.upsert, col_name, points, False)
+            except Exception as e:
+                logger.error(f"Upsert to {col_name} failed: {e}")
+                self._fail(pages)
+                continue
+            for page in pages:
+                page.remaining -= 1
+                if page.remaining == 0: await self._done(page)
+
+    def _fail(self, pages):
+        for page in pages:
+            page.failed = True
+            self.stats["failed_chunks"] += 1
+
+    async def _done(self, page):
+        if page.failed or page.on_indexed is None: return
+        try: await page.on_indexed()
+        except Exception as e: logger.warning(f"on_indexed callback failed: {e}")
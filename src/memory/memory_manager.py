@@ -1,57 +1,176 @@
-import redis
-import json
-import os
-from qdrant_client import QdrantClient
-from src.utils.utils import sanitize_url, load_config
+import asyncio
+from qdrant_client import models
+from src.utils.utils import load_config, sanitize_url, chunk_id
+from src.utils.container import get_container
+from src.memory.answer_cache import answers_collection
+from src.utils.tracing import span
+from src.memory.vectors import DENSE_VECTOR, SPARSE_VECTOR, dense_params, sparse_params, to_sparse
 
 config = load_config()
 
+REPORT_SOURCE = "Phase 1 Report"
+FILTER_FIELDS = ("source", "crawl_id")
+
+# Collections already confirmed to exist, so hot paths skip the collection_exists round-trip
+_known_collections = set()
+# Collection -> whether it carries the sparse vector (collections from before hybrid search don't)
+_sparse_collections = {}
+
 class MemoryManager:
     def __init__(self):
-        try:
-            self.redis = redis.Redis(
-                host=config['memory']['redis_host'], 
-                port=config['memory']['redis_port'], 
-                decode_responses=True
-            )
-            self.redis.ping()
-        except:
-            print("⚠️ Redis connection failed. Chat history will be ephemeral.")
-
-        self.qdrant = QdrantClient(
-            host=config['memory']['qdrant_host'], 
-            port=config['memory']['qdrant_port']
-        )
-
-    def add_turn(self, url, role, content):
-        key = f"chat:{sanitize_url(url)}"
-        try:
-            self.redis.rpush(key, json.dumps({"role": role, "content": content}))
-            self.redis.ltrim(key, -10, -1)
-        except: pass
-
-    def get_history(self, url):
-        try:
-            items = self.redis.lrange(f"chat:{sanitize_url(url)}", 0, -1)
-            return [json.loads(i) for i in items]
-        except: return []
+        container = get_container()
+        self.qdrant = container.qdrant
+        self._container = container
+        settings = config.get('retrieval', {})
+        self.hybrid = settings.get('mode', 'hybrid') == 'hybrid'
+        self.candidates = settings.get('candidates', 20)
+        self.rerank = settings.get('rerank', False)
 
-    def save_knowledge(self, url, text_chunks, metadata_list=None):
-        col_name = sanitize_url(url)
+    @property
+    def embedder(self):
+        # Resolved on first use so agents that never touch Qdrant don't load the model
+        return self._container.embedder
+
+    @property
+    def sparse_embedder(self):
+        return self._container.sparse_embedder
+
+    @property
+    def embeddings(self):
+        """Batched, memoized embedding off the event loop; what the async paths use."""
+        return self._container.embeddings
+
+    async def add_turn(self, url, role, content):
+        await self._container.sessions.append(url, (role, content))
+
+    async def get_history(self, url):
+        """{"summary": ..., "turns": [...]}: the latest turns plus a summary of older ones."""
+        return await self._container.sessions.history(url)
+
+    def ensure_collection(self, col_name):
+        if col_name in _known_collections: return
         if not self.qdrant.collection_exists(col_name):
             self.qdrant.create_collection(
-                collection_name=col_name, 
-                vectors_config=self.qdrant.get_fastembed_vector_params()
+                collection_name=col_name,
+                vectors_config=dense_params(),
+                sparse_vectors_config=sparse_params() if self.hybrid else None
             )
-        
-        if metadata_list is None:
-            metadata_list = [{"source": "Phase 1 Report"} for _ in text_chunks]
+            for field in FILTER_FIELDS:
+                self.qdrant.create_payload_index(col_name, field_name=field, field_schema=models.PayloadSchemaType.KEYWORD)
+        _known_collections.add(col_name)
+
+    def has_sparse(self, col_name) -> bool:
+        if col_name not in _sparse_collections:
+            sparse = self.qdrant.get_collection(col_name).config.params.sparse_vectors or {}
+            _sparse_collections[col_name] = SPARSE_VECTOR in sparse
+        return _sparse_collections[col_name]
+
+    def embed_documents(self, docs):
+        """Dense vectors, plus sparse ones when hybrid retrieval is on (None otherwise). CPU-bound: call off the loop."""
+        dense = [v.tolist() for v in self.embedder.embed(docs, batch_size=len(docs))]
+        sparse = [to_sparse(e) for e in self.sparse_embedder.embed(docs, batch_size=len(docs))] if self.hybrid else None
+        return dense, sparse
+
+    def build_points(self, text_chunks, metadata_list, vectors, sparse_vectors=None):
+        sparse_vectors = sparse_vectors or [None] * len(vectors)
+        return [
+            models.PointStruct(
+                id=chunk_id(meta.get("source", ""), doc),
+                vector={DENSE_VECTOR: list(vec), **({SPARSE_VECTOR: sp} if sp is not None else {})},
+                payload={"document": doc, **meta}
+            )
+            for doc, meta, vec, sp in zip(text_chunks, metadata_list, vectors, sparse_vectors)
+        ]
+
+    def invalidate_answers(self, col_name):
+        """Cached chat answers for a URL are stale as soon as its knowledge changes. Writers call this once
+        per logical update (a crawl, a saved report), not per batch."""
+        cache_col = answers_collection(col_name)
+        if self.qdrant.collection_exists(cache_col):
+            self.qdrant.delete_collection(cache_col)
 
-        self.qdrant.add(collection_name=col_name, documents=text_chunks, metadata=metadata_list)
+    def upsert(self, col_name, points, wait=True):
+        self.ensure_collection(col_name)
+        if not self.has_sparse(col_name):
+            for p in points: p.vector.pop(SPARSE_VECTOR, None)
+        self.qdrant.upsert(collection_name=col_name, points=points, wait=wait)
+
+    def delete_points(self, url, ids):
+        col_name = sanitize_url(url)
+        self.qdrant.delete(collection_name=col_name, points_selector=models.PointIdsList(points=list(ids)))
+
+    def save_knowledge(self, url, text_chunks, metadata_list=None):
+        if metadata_list is None:
+            metadata_list = [{"source": REPORT_SOURCE} for _ in text_chunks]
 
-    def recall(self, url, query, top_k=3):
+        vectors, sparse = self.embed_documents(text_chunks)
         col_name = sanitize_url(url)
-        if not self.qdrant.collection_exists(col_name): return None
-        res = self.qdrant.query(collection_name=col_name, query_text=query, limit=top_k)
+        self.upsert(col_name, self.build_points(text_chunks, metadata_list, vectors, sparse))
+        self.invalidate_answers(col_name)
+
+    async def asave_knowledge(self, url, text_chunks, metadata_list=None):
+        if metadata_list is None:
+            metadata_list = [{"source": REPORT_SOURCE} for _ in text_chunks]
+        vectors, sparse = await self.embeddings.documents(text_chunks)
+        await asyncio.to_thread(self.upsert, sanitize_url(url), self.build_points(text_chunks, metadata_list, vectors, sparse))
+
+    @staticmethod
+    def _filter(source=None, crawl_id=None):
+        conditions = []
+        for field, value in (("source", source), ("crawl_id", crawl_id)):
+            if value is None: continue
+            match = models.MatchAny(any=list(value)) if isinstance(value, (list, tuple, set)) else models.MatchValue(value=value)
+            conditions.append(models.FieldCondition(key=field, match=match))
+        return models.Filter(must=conditions) if conditions else None
+
+    def search(self, url, query, top_k=3, source=None, crawl_id=None):
+        """Hybrid (sparse + dense, RRF-fused) or dense search over a URL's collection, optionally
+        restricted to given sources / crawl ids and cross-encoder reranked. Returns point payloads,
+        or None if nothing is indexed."""
+        with span("memory.search", hybrid=self.hybrid, rerank=self.rerank) as s:
+            col_name = sanitize_url(url)
+            if not self.qdrant.collection_exists(col_name): return None
+            dense = next(iter(self.embedder.query_embed(query))).tolist()
+            sparse = to_sparse(next(iter(self.sparse_embedder.query_embed(query)))) if self.hybrid and self.has_sparse(col_name) else None
+            res = self._query(col_name, query, dense, sparse, top_k, source, crawl_id)
+            s.set(hits=len(res))
+            return res
+
+    async def asearch(self, url, query, top_k=3, source=None, crawl_id=None):
+        """`search` for async callers: the query is embedded by the shared EmbeddingService (batched across
+        requests, memoized per query string) and Qdrant is called with the precomputed vectors in a thread."""
+        with span("memory.search", hybrid=self.hybrid, rerank=self.rerank) as s:
+            col_name = sanitize_url(url)
+            if not await asyncio.to_thread(self.qdrant.collection_exists, col_name): return None
+            dense, sparse = await self.embeddings.query(query)
+            res = await asyncio.to_thread(self._query, col_name, query, dense, sparse, top_k, source, crawl_id)
+            s.set(hits=len(res))
+            return res
+
+    def _query(self, col_name, query, dense, sparse, top_k, source, crawl_id):
+        flt = self._filter(source, crawl_id)
+        limit = max(top_k, self.candidates) if self.rerank else top_k
+        if sparse is not None and self.hybrid and self.has_sparse(col_name):
+            # Exact terms (tickers, product names, figures) come from BM25, paraphrases from the dense side
+            res = self.qdrant.query_points(
+                collection_name=col_name,
+                prefetch=[
+                    models.Prefetch(query=dense, using=DENSE_VECTOR, filter=flt, limit=max(limit, self.candidates)),
+                    models.Prefetch(query=sparse, using=SPARSE_VECTOR, filter=flt, limit=max(limit, self.candidates)),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF), limit=limit
+            ).points
+        else:
+            res = self.qdrant.query_points(
+                collection_name=col_name, query=dense, using=DENSE_VECTOR, query_filter=flt, limit=limit
+            ).points
+        payloads = [r.payload for r in res]
+        if self.rerank and len(payloads) > 1:
+            scores = list(self._container.reranker.rerank(query, [p.get("document", "") for p in payloads]))
+            payloads = [p for _, p in sorted(zip(scores, payloads), key=lambda x: -x[0])]
+        return payloads[:top_k]
+
+    def recall(self, url, query, top_k=3, source=None, crawl_id=None):
+        res = self.search(url, query, top_k, source=source, crawl_id=crawl_id)
         if not res: return None
-        return "\n".join([f"- {r.metadata.get('document', r.metadata)}" for r in res])
\ No newline at end of file
+        return "\n".join([f"- {r.get('document', r)}" for r in res])
@@ -0,0 +1,49 @@
+import json
+import time
+from config.logger_config import get_logger
+from src.utils.utils import sanitize_url
+from src.utils.container import get_container
+
+logger = get_logger("manifest")
+
+# Used when Redis is down so a single process still gets incremental behaviour
+_local_manifests = {}
+
+class PageManifest:
+    """Per-domain record of what is indexed: page URL -> {etag, last_modified, hash, chunk_ids, links, crawled_at}."""
+    def __init__(self, url: str):
+        self.key = f"manifest:{sanitize_url(url)}"
+        self.redis = get_container().aredis
+        self.entries = {}
+
+    async def load(self):
+        try:
+            raw = await self.redis.hgetall(self.key)
+            self.entries = {page: json.loads(entry) for page, entry in raw.items()}
+        except Exception as e:
+            logger.warning(f"⚠️ Manifest Redis unavailable, using process-local copy: {e}")
+            self.redis = None
+            self.entries = dict(_local_manifests.get(self.key, {}))
+        return self
+
+    def get(self, page: str):
+        return self.entries.get(page)
+
+    async def put(self, page: str, entry: dict):
+        entry = {**entry, "crawled_at": time.time()}
+        self.entries[page] = entry
+        if self.redis:
+            try: await self.redis.hset(self.key, page, json.dumps(entry))
+            except Exception as e: logger.warning(f"Manifest write failed: {e}")
+        else:
+            _local_manifests.setdefault(self.key, {})[page] = entry
+
+    async def remove(self, pages):
+        pages = [p for p in pages if p in self.entries]
+        if not pages: return
+        for page in pages: self.entries.pop(page)
+        if self.redis:
+            try: await self.redis.hdel(self.key, *pages)
+            except Exception as e: logger.warning(f"Manifest delete failed: {e}")
+        else:
+            for page in pages: _local_manifests.get(self.key, {}).pop(page, None)
@@ -0,0 +1,55 @@
+import json
+import time
+from config.logger_config import get_logger
+from src.utils.utils import sanitize_url
+from src.utils.container import get_container
+from src.utils.tracing import record_cache
+from src.utils.redis_backoff import RedisBackoff
+
+logger = get_logger("report_cache")
+
+# Used when Redis is down so a single process still skips repeat research
+_local_reports = {}
+
+class ReportCache:
+    """Finished Phase 1 reports per URL (report:<url> in Redis), served while younger than `ttl` seconds."""
+    def __init__(self, ttl: int = 86400, redis_client=None):
+        self.ttl = ttl
+        self._redis = RedisBackoff(redis_client if redis_client is not None else get_container().aredis, "the report cache")
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def redis(self): return self._redis.client
+
+    def _key(self, url): return f"report:{sanitize_url(url)}"
+
+    async def get(self, url, record: bool = True):
+        """The fresh entry for `url`, or None. `record=False` for polling that shouldn't count as lookups."""
+        key = self._key(url)
+        entry = None
+        if self.redis:
+            try:
+                raw = await self.redis.get(key)
+                entry = json.loads(raw) if raw else None
+            except Exception as e:
+                self._redis.failed(e)
+        if not self.redis: entry = _local_reports.get(key)
+        hit = bool(entry) and time.time() - entry["created_at"] < self.ttl
+        if record:
+            self.stats["hits" if hit else "misses"] += 1
+            record_cache("reports", hit)
+        return entry if hit else None
+
+    async def set(self, url, report: str, tracking_id: str):
+        key = self._key(url)
+        entry = {"report": report, "tracking_id": tracking_id, "created_at": time.time()}
+        if self.redis:
+            try:
+                await self.redis.set(key, json.dumps(entry), ex=self.ttl)
+                return
+            except Exception as e:
+                self._redis.failed(e)
+        _local_reports[key] = entry
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "ttl": self.ttl, "backend": "redis" if self.redis else "local"}
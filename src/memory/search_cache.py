@@ -0,0 +1,74 @@
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from config.logger_config import get_logger
+from src.utils.redis_backoff import RedisBackoff
+
+logger = get_logger("search_cache")
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation and whitespace insensitive form so near-identical queries share an entry."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s$%.&-]", " ", query.lower())).strip()
+
+class SearchCache:
+    """Two-tier web search cache: in-process LRU with TTL in front of an optional shared Redis tier."""
+    def __init__(self, ttl: int = 86400, max_entries: int = 2048, redis_client=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "redis_hits": 0, "evictions": 0}
+        self._redis = RedisBackoff(redis_client, "the search cache")
+
+    @property
+    def redis(self): return self._redis.client
+
+    def _key(self, provider: str, query: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"search:{provider}:{digest}"
+
+    def _put_local(self, key, value):
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get(self, provider: str, query: str):
+        key = self._key(provider, query)
+        entry = self._local.get(key)
+        if entry:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._local.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._local[key]
+
+        if self.redis:
+            try:
+                raw = await self.redis.get(key)
+            except Exception as e:
+                raw = None
+                self._redis.failed(e)
+            if raw:
+                value = tuple(json.loads(raw))
+                self._put_local(key, value)
+                self.stats["hits"] += 1
+                self.stats["redis_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, provider: str, query: str, value: tuple):
+        key = self._key(provider, query)
+        self._put_local(key, value)
+        if self.redis:
+            try: await self.redis.set(key, json.dumps(value), ex=self.ttl)
+            except Exception as e: self._redis.failed(e)
+
+    def get_stats(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "size": len(self._local), "hit_rate": self.stats["hits"] / lookups if lookups else 0.0}
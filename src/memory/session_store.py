@@ -0,0 +1,191 @@
+import json
+import time
+import asyncio
+from redis.exceptions import WatchError
+from config.logger_config import get_logger
+from src.utils.utils import sanitize_url
+from src.utils.container import get_container
+from src.utils.locks import acquire_lock, release_lock
+from src.utils.redis_backoff import RedisBackoff
+
+try:
+    import msgpack
+except ImportError:  # JSON bytes instead; larger, same behaviour
+    msgpack = None
+
+logger = get_logger("sessions")
+
+ROLES = {"user": "u", "assistant": "a"}
+ROLE_NAMES = {v: k for k, v in ROLES.items()}
+
+# Used when Redis is down so a single process still keeps its conversations
+_local_sessions = {}
+
+def pack_turn(role: str, content: str) -> bytes:
+    turn = [ROLES.get(role, role), content, int(time.time())]
+    return msgpack.packb(turn) if msgpack else json.dumps(turn).encode("utf-8")
+
+def unpack_turn(raw: bytes):
+    """The turn in `raw`, or None if it doesn't decode. Sessions written before msgpack ({"role", "content"}
+    JSON under the same key) still read."""
+    try:
+        turn = msgpack.unpackb(raw) if msgpack else json.loads(raw)
+    except Exception:
+        try: turn = json.loads(raw)
+        except Exception: return None
+    if isinstance(turn, dict) and "content" in turn:
+        return {"role": turn.get("role", "user"), "content": turn["content"], "ts": 0}
+    if not isinstance(turn, list) or len(turn) != 3: return None
+    role, content, ts = turn
+    return {"role": ROLE_NAMES.get(role, role), "content": content, "ts": ts}
+
+def unpack_turns(raw: list) -> list:
+    return [t for t in map(unpack_turn, raw) if t is not None]
+
+def summary_line(history: dict) -> str:
+    return f"Summary of earlier conversation: {history['summary']}" if history.get("summary") else ""
+
+def turn_lines(history: dict) -> list:
+    return [f"{t['role']}: {t['content']}" for t in history.get("turns", [])]
+
+def format_history(history: dict) -> str:
+    return "\n".join(filter(None, [summary_line(history), *turn_lines(history)]))
+
+class SessionStore:
+    """Per-URL chat sessions on async Redis: chat:<url> is a list of msgpack [role, content, ts] turns,
+    chat:<url>:summary a rolling summary of the turns that have been folded out of the list.
+
+    Every call is one pipelined round-trip (append + trim + expire, plus the read when a request starts).
+    Once a session holds more than `summarize_after` turns, the oldest are summarized by the LLM in the
+    background until `max_turns` remain; the list is hard-capped at twice `summarize_after` regardless.
+    """
+    def __init__(self, redis_client=None, ttl: int = 604800, window: int = 6, max_turns: int = 10, summarize_after: int = 20):
+        container = get_container()
+        self._redis = RedisBackoff(redis_client if redis_client is not None else container.aredis_bytes, "chat sessions")
+        self.llm = container.llm
+        self.prompts = container.prompts
+        self.ttl = ttl
+        self.window = window
+        self.max_turns = max_turns
+        self.summarize_after = summarize_after
+        self._tasks = set()
+
+    @property
+    def redis(self): return self._redis.client
+
+    @staticmethod
+    def _keys(url):
+        key = f"chat:{sanitize_url(url)}"
+        return key, f"{key}:summary", f"{key}:summarizing"
+
+    def _pipe_append(self, pipe, key, summary_key, turns):
+        pipe.rpush(key, *turns)
+        pipe.ltrim(key, -2 * self.summarize_after, -1)
+        pipe.expire(key, self.ttl)
+        pipe.expire(summary_key, self.ttl)
+
+    async def start_turn(self, url, message) -> dict:
+        """Records the user's message and returns the history before it: {"summary", "turns"} (latest `window` turns)."""
+        key, summary_key, _ = self._keys(url)
+        turn = pack_turn("user", message)
+        if self.redis:
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.lrange(key, -self.window, -1)
+                    pipe.get(summary_key)
+                    self._pipe_append(pipe, key, summary_key, [turn])
+                    raw, summary, *_ = await pipe.execute()
+            except Exception as e:
+                self._redis.failed(e)
+            else:
+                # Decoded outside the try: an unreadable turn is skipped, not mistaken for a Redis outage
+                return {"summary": summary.decode("utf-8") if summary else "", "turns": unpack_turns(raw)}
+        session = _local_sessions.setdefault(key, {"summary": "", "turns": []})
+        history = {"summary": session["summary"], "turns": unpack_turns(session["turns"][-self.window:])}
+        session["turns"] = (session["turns"] + [turn])[-self.max_turns:]
+        return history
+
+    async def append(self, url, *turns):
+        """Appends (role, content) turns; may schedule a background summary of the oldest ones."""
+        key, summary_key, _ = self._keys(url)
+        packed = [pack_turn(role, content) for role, content in turns]
+        if self.redis:
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    self._pipe_append(pipe, key, summary_key, packed)
+                    pipe.llen(key)
+                    length = (await pipe.execute())[-1]
+                if length > self.summarize_after:
+                    task = asyncio.create_task(self._summarize(url))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return
+            except Exception as e:
+                self._redis.failed(e)
+        session = _local_sessions.setdefault(key, {"summary": "", "turns": []})
+        session["turns"] = (session["turns"] + packed)[-self.max_turns:]
+
+    async def history(self, url) -> dict:
+        key, summary_key, _ = self._keys(url)
+        if self.redis:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.lrange(key, -self.window, -1)
+                    pipe.get(summary_key)
+                    raw, summary = await pipe.execute()
+            except Exception as e:
+                self._redis.failed(e)
+            else:
+                return {"summary": summary.decode("utf-8") if summary else "", "turns": unpack_turns(raw)}
+        session = _local_sessions.get(key, {"summary": "", "turns": []})
+        return {"summary": session["summary"], "turns": unpack_turns(session["turns"][-self.window:])}
+
+    async def _summarize(self, url):
+        """Folds all but the latest `max_turns` turns into the summary. One summarizer per session across workers."""
+        key, summary_key, lock_key = self._keys(url)
+        redis = self.redis
+        if not redis: return
+        try:
+            token = await acquire_lock(redis, lock_key, 120)
+            if not token: return
+        except Exception as e:
+            return logger.warning(f"Session summary failed: {e}")
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.llen(key)
+                pipe.get(summary_key)
+                length, summary = await pipe.execute()
+            overflow = length - self.max_turns
+            if overflow <= 0: return
+            old = await redis.lrange(key, 0, overflow - 1)
+            sys = self.prompts['session_summary'].format(
+                summary=summary.decode("utf-8") if summary else "(none)",
+                turns=format_history({"turns": unpack_turns(old)})
+            )
+            new_summary = await self.llm.chat(sys, "Summarize")
+            if not new_summary or new_summary.startswith("Error:"): return
+            async with redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(key)
+                        head = await pipe.lrange(key, 0, len(old) - 1)
+                        # Appends during the LLM call may have hard-capped some summarized turns off the head
+                        # already: only drop the ones still there, never the newer turns behind them
+                        drop = next((len(old) - k for k in range(len(old)) if head[:len(old) - k] == old[k:]), 0)
+                        pipe.multi()
+                        pipe.set(summary_key, new_summary.encode("utf-8"), ex=self.ttl)
+                        if drop: pipe.ltrim(key, drop, -1)
+                        await pipe.execute()
+                        break
+                    except WatchError:
+                        continue
+            logger.info(f"🧾 Summarized {overflow} older turns for {sanitize_url(url)}")
+        except Exception as e:
+            logger.warning(f"Session summary failed: {e}")
+        finally:
+            try: await release_lock(redis, lock_key, token)
+            except Exception: pass
+
+    async def aclose(self):
+        for task in list(self._tasks): task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,28 @@
+from functools import lru_cache
+from qdrant_client import models
+from src.utils.utils import load_config
+
+config = load_config()
+settings = config.get('retrieval', {})
+
+DENSE_MODEL = settings.get('dense_model', "BAAI/bge-small-en")
+SPARSE_MODEL = settings.get('sparse_model', "Qdrant/bm25")
+RERANK_MODEL = settings.get('rerank_model', "Xenova/ms-marco-MiniLM-L-6-v2")
+
+# Same field names qdrant-client's fastembed helpers used to generate, so existing collections keep working
+DENSE_VECTOR = f"fast-{DENSE_MODEL.split('/')[-1].lower()}"
+SPARSE_VECTOR = f"fast-sparse-{SPARSE_MODEL.split('/')[-1].lower()}"
+
+@lru_cache(maxsize=1)
+def dense_params() -> dict:
+    from fastembed import TextEmbedding
+    info = next(m for m in TextEmbedding.list_supported_models() if m["model"].lower() == DENSE_MODEL.lower())
+    return {DENSE_VECTOR: models.VectorParams(size=info["dim"], distance=models.Distance.COSINE)}
+
+def sparse_params() -> dict:
+    # BM25/BM42 only store term frequencies; Qdrant applies IDF at query time
+    idf = any(k in SPARSE_MODEL.lower() for k in ("bm25", "bm42"))
+    return {SPARSE_VECTOR: models.SparseVectorParams(modifier=models.Modifier.IDF if idf else None)}
+
+def to_sparse(embedding) -> models.SparseVector:
+    return models.SparseVector(indices=embedding.indices.tolist(), values=embedding.values.tolist())
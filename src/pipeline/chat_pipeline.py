@@ -1,12 +1,14 @@
 import asyncio
-import redis
-import json
 from config.logger_config import WorkNotesManager, get_logger
-from src.utils.utils import load_config, sanitize_url
+from src.utils.utils import load_config
+from src.utils.container import get_container
+from src.utils.tracing import span
 
 from src.memory.memory_manager import MemoryManager
+from src.memory.answer_cache import SemanticAnswerCache
 from src.agents.common.tools_agent import ToolsAgent
 from src.agents.conversation.orchestrator import OrchestratorAgent
+from src.agents.conversation.router import IntentRouter
 from src.agents.conversation.decomposer import DecomposerAgent
 from src.agents.conversation.evidencer import EvidenceAgent
 from src.agents.conversation.answer import AnswerAgent
@@ -17,43 +19,126 @@ config = load_config()
 class ChatPipeline:
     def __init__(self):
         self.orchestrator = OrchestratorAgent()
+        routing = config.get('routing', {})
+        self.router = None
+        if routing.get('fast_path', True):
+            self.router = IntentRouter(routing.get('min_similarity', 0.82), routing.get('min_margin', 0.04))
         self.tools = ToolsAgent()
         self.evidencer = EvidenceAgent()
         self.decomposer = DecomposerAgent()
         self.answer_agent = AnswerAgent()
         self.memory = MemoryManager()
-        
-        try:
-            self.redis = redis.Redis(
-                host=config['memory']['redis_host'], 
-                port=config['memory']['redis_port'], 
-                decode_responses=True
+        self.sessions = get_container().sessions
+        settings = config.get('cache', {}).get('answers', {})
+        self.answer_cache = None
+        if settings.get('enabled', True):
+            self.answer_cache = SemanticAnswerCache(
+                settings.get('threshold', 0.92), settings.get('ttl', 604800), settings.get('min_standalone_words', 5),
+                settings.get('live_ttl', 900)
             )
-        except: self.redis = None
 
-    async def run(self, message: str, url: str):
-        wn = WorkNotesManager()
+    async def _run_query(self, wn, message, url, query, decision):
+        """One sub-query's retrieve -> audit -> refine journey. Returns (journey, accepted evidence or None)."""
+        candidate_queries = [query]
+        loops = 0
+        is_sufficient = False
+        force_web = (decision == "SEARCH")
+        accepted = None
+        
+        query_journey = {"original_query": query, "attempts": []}
+        
+        while loops < config['tools']['max_loops'] and not is_sufficient:
+            current_q = candidate_queries[0]
+            attempt_log = {"loop": loops+1, "query": current_q}
+            wn.add_note("Loop", f"Attempt {loops+1}: {current_q}")
+            
+            # A. Retrieve
+            evidence = ""
+            source = "Qdrant"
+            meta_data = []
+            
+            if not force_web:
+                evidence, meta_data = await self.tools.recall_memory(wn, url, current_q)
+                if not evidence:
+                    source = "SerpAI (Fallback)"
+                    evidence, meta_data = await self.tools.search_web(wn, current_q)
+            else:
+                source = "SerpAI (Forced)"
+                evidence, meta_data = await self.tools.search_web(wn, current_q)
+            
+            attempt_log["source"] = source
+            attempt_log["tools_output"] = meta_data
+            
+            # B. Audit
+            audit = await self.evidencer.analyze(wn, message, evidence)
+            is_sufficient = audit.get("sufficient", False)
+            feedback = audit.get("feedback", "Missing data")
+            
+            attempt_log["audit_passed"] = is_sufficient
+            attempt_log["audit_feedback"] = feedback
+            
+            if is_sufficient:
+                accepted = evidence
+                wn.add_note("Evidencer", "Evidence Accepted.")
+            else:
+                wn.add_note("Evidencer", f"Insufficient: {feedback}")
+                if source == "Qdrant": 
+                    force_web = True
+                    wn.add_note("Pipeline", "Switching to Web Search for next attempt.")
+                
+                new_qs = await self.decomposer.refine(wn, current_q, feedback)
+                candidate_queries = new_qs 
+                loops += 1
+            
+            query_journey["attempts"].append(attempt_log)
+
+        return query_journey, accepted
+
+    async def run(self, message: str, url: str, wn: WorkNotesManager = None):
+        """Returns answer, work notes and a trace that includes the timed span tree of the whole request."""
+        with span("pipeline.chat") as root:
+            result = await self._run(message, url, wn)
+        result["trace"]["spans"] = root.to_dict()
+        return result
+
+    async def _run(self, message, url, wn=None):
+        wn = wn or WorkNotesManager()
         wn.add_note("Pipeline", f"Processing: '{message}' for '{url}'")
         
         trace = {"initial_intent": "", "decomposition": [], "execution_steps": []}
-        session_key = f"chat:{sanitize_url(url)}"
+        # One round-trip: record the message, read the conversation before it
+        history = await self.sessions.start_turn(url, message)
+
+        # 0. Semantic answer cache (not for follow-ups that only make sense in this conversation)
+        cacheable = bool(self.answer_cache) and self.answer_cache.cacheable(message, history)
+        cached = await self.answer_cache.lookup(url, message) if cacheable else None
+        if cached:
+            wn.add_note("Cache", f"Reusing answer to '{cached['question']}' (similarity {cached['score']:.2f})")
+            wn.emit("token", {"text": cached["answer"]})
+            await self.sessions.append(url, ("assistant", cached["answer"]))
+            trace = {**cached["trace"], "cache_hit": {"question": cached["question"], "score": cached["score"]}}
+            return {"answer": cached["answer"], "work_notes": wn.get_all_notes(), "trace": trace}
         
         # 1. Routing
+        # Confident fast-path matches skip the orchestrator's LLM round-trip
         try:
-            route = await self.orchestrator.route(wn, message, url)
+            route = await self.router.route(wn, message) if self.router else None
+            route = route or await self.orchestrator.route(wn, message, url)
             decision = route.get("decision", "CHAT")
             refined_query = route.get("query", message)
         except:
+            route = {}
             decision = "CHAT"
             refined_query = message
 
         trace["initial_intent"] = decision
+        trace["router"] = route.get("router", "llm")
         wn.add_note("Orchestrator", f"Decision: {decision}")
+        wn.emit("trace", {"initial_intent": decision})
         
         if decision == "CHAT":
-            hist = []
-            if self.redis: hist = self.redis.lrange(session_key, 0, 5)
-            final_ans = await self.answer_agent.generate(wn, message, f"Chat History: {hist}")
+            final_ans = await self.answer_agent.generate(wn, message, history=history)
+            await self.sessions.append(url, ("assistant", final_ans))
             return {"answer": final_ans, "work_notes": wn.get_all_notes(), "trace": trace}
 
         # 2. Research Loop
@@ -64,68 +149,36 @@ class ChatPipeline:
             sub_queries = await self.decomposer.decompose(wn, refined_query, url)
             
         trace["decomposition"] = sub_queries
+        wn.emit("trace", {"decomposition": sub_queries})
         collected_evidence = []
-        
-        for query in sub_queries:
-            candidate_queries = [query]
-            loops = 0
-            is_sufficient = False
-            force_web = (decision == "SEARCH")
-            
-            query_journey = {"original_query": query, "attempts": []}
-            
-            while loops < config['tools']['max_loops'] and not is_sufficient:
-                current_q = candidate_queries[0]
-                attempt_log = {"loop": loops+1, "query": current_q}
-                wn.add_note("Loop", f"Attempt {loops+1}: {current_q}")
-                
-                # A. Retrieve
-                evidence = ""
-                source = "Qdrant"
-                meta_data = []
-                
-                if not force_web:
-                    evidence, meta_data = await self.tools.recall_memory(wn, url, current_q)
-                    if not evidence:
-                        source = "SerpAI (Fallback)"
-                        evidence, meta_data = await self.tools.search_web(wn, current_q)
-                else:
-                    source = "SerpAI (Forced)"
-                    evidence, meta_data = await self.tools.search_web(wn, current_q)
-                
-                attempt_log["source"] = source
-                attempt_log["tools_output"] = meta_data
-                
-                # B. Audit
-                audit = await self.evidencer.analyze(wn, message, evidence)
-                is_sufficient = audit.get("sufficient", False)
-                feedback = audit.get("feedback", "Missing data")
-                
-                attempt_log["audit_passed"] = is_sufficient
-                attempt_log["audit_feedback"] = feedback
-                
-                if is_sufficient:
-                    collected_evidence.append(evidence)
-                    wn.add_note("Evidencer", "Evidence Accepted.")
-                else:
-                    wn.add_note("Evidencer", f"Insufficient: {feedback}")
-                    if source == "Qdrant": 
-                        force_web = True
-                        wn.add_note("Pipeline", "Switching to Web Search for next attempt.")
-                    
-                    new_qs = await self.decomposer.refine(wn, current_q, feedback)
-                    candidate_queries = new_qs 
-                    loops += 1
-                
-                query_journey["attempts"].append(attempt_log)
-            
-            trace["execution_steps"].append(query_journey)
+
+        # Sub-query journeys run concurrently; results are collected in decomposition order
+        limit = asyncio.Semaphore(config['tools'].get('max_parallel_subqueries', 4))
+
+        async def bounded(index, query):
+            async with limit:
+                with span("chat.subquery", index=index):
+                    journey, evidence = await self._run_query(wn, message, url, query, decision)
+            wn.emit("trace", {"execution_step": journey, "index": index})
+            return journey, evidence
+
+        tasks = [asyncio.ensure_future(bounded(i, q)) for i, q in enumerate(sub_queries)]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # A failed journey or an abandoned request must not leave siblings running
+            for t in tasks: t.cancel()
+
+        for journey, evidence in results:
+            trace["execution_steps"].append(journey)
+            if evidence: collected_evidence.append(evidence)
 
         # 3. Final Answer
         final_ans = await self.answer_agent.generate(wn, message, "\n".join(collected_evidence))
         
-        if self.redis:
-            self.redis.rpush(session_key, json.dumps({"role": "user", "content": message}))
-            self.redis.rpush(session_key, json.dumps({"role": "assistant", "content": final_ans}))
+        await self.sessions.append(url, ("assistant", final_ans))
+        # Only evidence-backed answers are reusable; CHAT replies depend on the conversation
+        if cacheable and collected_evidence:
+            await self.answer_cache.store(url, message, final_ans, trace, live=(decision == "SEARCH"))
         
         return {"answer": final_ans, "work_notes": wn.get_all_notes(), "trace": trace}
\ No newline at end of file
@@ -1,13 +1,23 @@
+import time
 import uuid
+import asyncio
+from itertools import chain, zip_longest
 from config.logger_config import WorkNotesManager, get_logger
-from src.memory.memory_manager import MemoryManager
+from src.memory.memory_manager import MemoryManager, REPORT_SOURCE
+from src.memory.page_manifest import PageManifest
+from src.memory.report_cache import ReportCache
 from src.agents.research.scout import ScoutAgent
 from src.agents.research.strategist import StrategistAgent
 from src.agents.research.finance import BaseResearcher
 from src.agents.research.writer import WriterAgent
-from src.agents.common.crawler_agent import CrawlerAgent
+from src.utils.container import get_container
+from src.utils.tracing import span
+from src.utils.locks import acquire_lock, release_lock
+from src.utils.chunker import MarkdownChunker
+from src.utils.utils import load_config, content_hash, chunk_id, sanitize_url
 
 logger = get_logger("research_pipeline")
+config = load_config()
 
 class ResearchPipeline:
     def __init__(self):
@@ -16,11 +26,91 @@ class ResearchPipeline:
         self.strategist = StrategistAgent()
         self.researcher = BaseResearcher("Specialist")
         self.writer = WriterAgent()
-        self.crawler = CrawlerAgent()
+        self.jobs = get_container().jobs
+        self.chunker = MarkdownChunker(**config.get('chunking', {}))
+        settings = config.get('cache', {}).get('reports', {})
+        self.reports = ReportCache(settings.get('ttl', 86400)) if settings.get('enabled', True) else None
+        self.lock_ttl = settings.get('lock_ttl', 300)
+        # sanitize_url(url) -> task of the research run currently in progress for it
+        self._inflight = {}
 
-    async def run(self, url: str):
+    async def run(self, url: str, wn: WorkNotesManager = None):
+        """Fresh cached report if there is one; otherwise joins the in-flight run for this URL or starts it.
+
+        Every concurrent caller for a URL shares one Scout/Strategist/search/Writer/ingest pass: callers in
+        this process await the same task, other worker processes wait for its report through Redis.
+        """
+        wn = wn or WorkNotesManager()
+        with span("pipeline.research") as root:
+            result = await self._cached(url, wn)
+            if result is None:
+                key = sanitize_url(url)
+                task = self._inflight.get(key)
+                root.set(coalesced=task is not None)
+                if task is None:
+                    task = asyncio.create_task(self._lead(url, wn))
+                    self._inflight[key] = task
+                    task.add_done_callback(lambda _: self._inflight.pop(key, None))
+                else:
+                    wn.add_note("Pipeline", f"Joining research already in progress for {url}")
+                # Shielded: a caller that goes away must not cancel the run the others are waiting on
+                result = dict(await asyncio.shield(task))
+                if root.attrs["coalesced"]: self._replay(wn, result)
+        result["trace"] = {"spans": root.to_dict()}
+        return result
+
+    async def _cached(self, url, wn, record=True):
+        entry = await self.reports.get(url, record) if self.reports else None
+        if entry is None: return None
+        wn.add_note("Cache", f"Serving report from {time.time() - entry['created_at']:.0f}s ago (ID: {entry['tracking_id']})")
+        result = {"status": "success", "tracking_id": entry["tracking_id"], "report": entry["report"], "cached": True}
+        self._replay(wn, result)
+        return result
+
+    async def _lead(self, url, wn):
+        """This process's run for `url`, unless another worker holds research:lock:<url>: then its report is awaited."""
+        redis = self.reports.redis if self.reports else None
+        if redis is None: return await self._run_and_cache(url, wn)
+        key = f"research:lock:{sanitize_url(url)}"
+        waited = False
+        while True:
+            try: token = await acquire_lock(redis, key, self.lock_ttl)
+            except Exception as e:
+                logger.warning(f"Research lock unavailable, running without it: {e}")
+                return await self._run_and_cache(url, wn)
+            if token:
+                try: return await self._run_and_cache(url, wn)
+                finally: await release_lock(redis, key, token)
+            if not waited:
+                wn.add_note("Pipeline", f"Another worker is already researching {url}, waiting for its report")
+                waited = True
+            # The lock expires after lock_ttl, so a crashed holder is taken over rather than waited on forever
+            try:
+                while await redis.exists(key): await asyncio.sleep(0.5)
+            except Exception as e:
+                logger.warning(f"Lost the research lock's Redis while waiting, running here: {e}")
+                return await self._run_and_cache(url, wn)
+            result = await self._cached(url, wn, record=False)
+            if result: return result
+
+    @staticmethod
+    def _replay(wn, result):
+        """Callers that didn't run the pipeline themselves get the report as one token event and their own notes."""
+        wn.emit("token", {"text": result["report"]})
+        result["notes"] = wn.get_all_notes()
+
+    async def _run_and_cache(self, url, wn):
+        result = await self._run(url, wn)
+        # Queue the crawl before caching, so the cached tracking_id is the job that really covers the domain
+        # (an earlier crawl still queued or running wins over the id this run generated)
+        job = await self.trigger_deep_crawl(url, result["tracking_id"])
+        result["tracking_id"] = job["id"] if job else None
+        if self.reports: await self.reports.set(url, result["report"], result["tracking_id"])
+        return result
+
+    async def _run(self, url, wn=None):
         crawl_id = str(uuid.uuid4())[:8]
-        wn = WorkNotesManager()
+        wn = wn or WorkNotesManager()
         wn.add_note("Pipeline", f"Starting Phase 1 Research: {url} (ID: {crawl_id})")
         
         # 1. Scout
@@ -29,16 +119,17 @@ class ResearchPipeline:
         # 2. Plan
         plan = await self.strategist.plan(wn, context, url)
         
-        # 3. Research
-        queries = plan.get('finance', []) + plan.get('marketing', [])
-        raw_data = await self.researcher.execute(wn, queries[:6])
+        # 3. Research (interleave so both finance and marketing make the cut)
+        pairs = zip_longest(plan.get('finance', []), plan.get('marketing', []))
+        queries = [q for q in chain.from_iterable(pairs) if q]
+        raw_data = await self.researcher.execute(wn, queries[:config['tools'].get('max_research_queries', 6)])
         
         # 4. Write
         report = await self.writer.write(wn, url, raw_data)
         
         # 5. Ingest Report
-        chunks = [report[i:i+800] for i in range(0, len(report), 800)]
-        self.memory.save_knowledge(url, chunks, [{"source": "Phase 1 Report", "document": c} for c in chunks])
+        with span("memory.ingest_report", bytes=len(report.encode("utf-8"))):
+            await self._ingest_report(url, report, self.chunker.split(report))
         wn.add_note("Pipeline", "Report saved to Qdrant.")
         
         return {
@@ -48,5 +139,29 @@ class ResearchPipeline:
             "notes": wn.get_all_notes()
         }
 
+    async def _ingest_report(self, url, report, pieces):
+        # Chunk IDs are content-derived, so only chunks from a previous, different report need deleting
+        manifest = await PageManifest(url).load()
+        chunks = [c.text for c in pieces]
+        ids = [chunk_id(REPORT_SOURCE, c) for c in chunks]
+        previous = manifest.get(REPORT_SOURCE)
+        stale = set(previous.get("chunk_ids", [])) - set(ids) if previous else set()
+        await self.memory.asave_knowledge(url, chunks, [{"source": REPORT_SOURCE, "document": c.text, "heading": c.heading} for c in pieces])
+        if stale: await asyncio.to_thread(self.memory.delete_points, url, stale)
+        # One invalidation for the whole report rather than one per write
+        await asyncio.to_thread(self.memory.invalidate_answers, sanitize_url(url))
+        await manifest.put(REPORT_SOURCE, {"hash": content_hash(report), "chunk_ids": ids})
+
     async def trigger_deep_crawl(self, url: str, crawl_id: str):
-        await self.crawler.deep_crawl(url, crawl_id)
\ No newline at end of file
+        """Queues the crawl for a worker, unless a crawl of the same domain is already queued or running.
+
+        Returns the job covering the domain; its id is where progress is available from the job queue. None if
+        the queue is unreachable: the report stands on its own, there is just no crawl to track.
+        """
+        try:
+            job = await self.jobs.enqueue_unique(crawl_id, url)
+        except Exception as e:
+            logger.error(f"Could not queue deep crawl for {url}: {e}")
+            return None
+        if job["id"] != crawl_id: logger.info(f"🔁 {job['domain']} already has crawl {job['id']} ({job['status']}), reusing it")
+        return job
\ No newline at end of file
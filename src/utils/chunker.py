@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # fall back to a regex estimate; close enough for sizing chunks
+    tiktoken = None
+
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+TABLE_RULE = re.compile(r"^\|?\s*:?-{3,}")
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None: return None
+    try: return tiktoken.get_encoding("cl100k_base")
+    except Exception: return None  # BPE file not cached and no network: estimate instead
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    return len(enc.encode(text, disallowed_special=())) if enc else len(APPROX_TOKEN.findall(text))
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """The longest prefix of `text` that is at most `max_tokens` tokens."""
+    enc = _encoding()
+    if enc:
+        tokens = enc.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+    matches = list(APPROX_TOKEN.finditer(text))
+    return text if len(matches) <= max_tokens else text[:matches[max_tokens].start()].rstrip()
+
+@dataclass
+class Chunk:
+    text: str
+    heading_path: list = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def heading(self) -> str:
+        return " > ".join(self.heading_path)
+
+class MarkdownChunker:
+    """Splits markdown on headings, then paragraphs, then sentences, packing units up to `max_tokens`.
+
+    Tables and fenced code blocks are kept whole when they fit; bigger ones are split by row (repeating
+    the header) or by line (re-opening the fence), never mid-line. Consecutive chunks of the same
+    section share roughly `overlap_tokens` of trailing context. Every chunk carries the heading
+    path it sits under; a heading line is always glued to the start of its section's first chunk
+    and never makes a chunk on its own.
+    """
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32, min_tokens: int = 8):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+
+    def _sections(self, text):
+        """Yields (heading_path, heading line or None, blocks) where blocks are paragraphs, tables, lists or
+        code fences. Sections without any body are skipped: their heading only contributes to the path."""
+        path, heading, blocks, current, in_fence = [], None, [], [], False
+        for line in text.splitlines():
+            stripped = line.strip()
+            if stripped.startswith("```"):
+                in_fence = not in_fence
+                current.append(line)
+                continue
+            if in_fence:
+                current.append(line)
+                continue
+            m = HEADING.match(stripped)
+            if m:
+                if current: blocks.append("\n".join(current))
+                if blocks: yield list(path), heading, blocks
+                level = len(m.group(1))
+                path = path[:level - 1] + [m.group(2)]
+                heading, blocks, current = stripped, [], []
+            elif not stripped:
+                if current: blocks.append("\n".join(current))
+                current = []
+            else:
+                current.append(line.rstrip())
+        if current: blocks.append("\n".join(current))
+        if blocks: yield list(path), heading, blocks
+
+    @staticmethod
+    def _pack_lines(head, lines, tail, limit):
+        """`lines` grouped into pieces of at most `limit` tokens, each wrapped in `head` and `tail` lines.
+        A single line over the limit still gets a piece of its own."""
+        pieces, current = [], []
+        fixed = count_tokens("\n".join(head + tail))
+        size = fixed
+        for line in lines:
+            cost = count_tokens(line) + 1
+            if current and size + cost > limit:
+                pieces.append("\n".join(head + current + tail))
+                current, size = [], fixed
+            current.append(line)
+            size += cost
+        if current or not pieces: pieces.append("\n".join(head + current + tail))
+        return pieces
+
+    def _units(self, block, limit=None):
+        """Breaks a block over `limit` tokens (default max_tokens) into units: tables by row, code fences by
+        line, prose by sentence (or, as a last resort, word window)."""
+        limit = limit or self.max_tokens
+        if count_tokens(block) <= limit: return [block]
+        lines = block.split("\n")
+        if lines[0].lstrip().startswith("```"):
+            closed = len(lines) > 1 and lines[-1].strip().startswith("```")
+            body = lines[1:-1] if closed else lines[1:]
+            return self._pack_lines(lines[:1], body, [lines[-1] if closed else "```"], limit)
+        if all(line.lstrip().startswith("|") for line in lines):
+            header = 2 if len(lines) > 1 and TABLE_RULE.match(lines[1].strip()) else 1
+            return self._pack_lines(lines[:header], lines[header:], [], limit)
+        units = []
+        for sentence in SENTENCE_END.split(block):
+            if count_tokens(sentence) <= limit:
+                units.append(sentence)
+                continue
+            words = sentence.split()
+            step = max(1, int(limit * 0.75))  # words run ~1.3 tokens each
+            units.extend(" ".join(words[i:i + step]) for i in range(0, len(words), step))
+        return units
+
+    @staticmethod
+    def _join(buf):
+        # Sentences of one paragraph rejoin with a space; separate blocks and table/code pieces with a blank line
+        out = buf[0][0]
+        for (_, _, prev_block), (unit, _, block) in zip(buf, buf[1:]):
+            prose = block == prev_block and not unit.lstrip().startswith(("|", "```"))
+            out += (" " if prose else "\n\n") + unit
+        return out
+
+    def split(self, text: str) -> list:
+        chunks = []
+        for path, heading, blocks in self._sections(text):
+            units = [(u, count_tokens(u), i) for i, b in enumerate(blocks) for u in self._units(b)]
+            if heading:
+                # The heading rides on the first unit; split that block smaller if both don't fit together
+                room = max(self.min_tokens, self.max_tokens - count_tokens(heading + "\n\n"))
+                first = self._units(blocks[0], room)
+                units = [(u, count_tokens(u), 0) for u in first] + [u for u in units if u[2] > 0]
+                head = f"{heading}\n\n{units[0][0]}"
+                units[0] = (head, count_tokens(head), 0)
+            buf, size = [], 0
+            for unit in units:
+                if buf and size + unit[1] > self.max_tokens:
+                    chunks.append(Chunk(self._join(buf), path, size))
+                    # Carry trailing units forward as overlap, never the whole buffer
+                    carry, carried = [], 0
+                    for prev in reversed(buf[1:]):
+                        if carried + prev[1] > self.overlap_tokens: break
+                        carry.insert(0, prev)
+                        carried += prev[1]
+                    buf, size = carry, carried
+                buf.append(unit)
+                size += unit[1]
+            if buf:
+                text_ = self._join(buf)
+                # Fold a tiny tail into the previous chunk of the same section
+                if size < self.min_tokens and chunks and chunks[-1].heading_path == path:
+                    prev = chunks[-1]
+                    chunks[-1] = Chunk(prev.text + "\n\n" + text_, path, prev.tokens + size)
+                else:
+                    chunks.append(Chunk(text_, path, size))
+        return chunks
@@ -0,0 +1,243 @@
+import os
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import httpx
+import redis.asyncio as aioredis
+from qdrant_client import QdrantClient
+from config.logger_config import get_logger
+from src.utils.utils import load_config, load_prompts
+
+logger = get_logger("container")
+
+class Container:
+    """Process-wide owner of every shared client. Agents and pipelines borrow from here instead of building their own.
+
+    Heavy members are created on first access so importing a module never opens a connection.
+    """
+    def __init__(self):
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _once(self, name, factory):
+        # Locked so that e.g. the embedding model never loads twice under concurrent first use
+        if name not in self._instances:
+            with self._lock:
+                if name not in self._instances: self._instances[name] = factory()
+        return self._instances[name]
+
+    @property
+    def config(self): return load_config()
+
+    @property
+    def prompts(self): return load_prompts()
+
+    @property
+    def qdrant(self) -> QdrantClient:
+        return self._once("qdrant", lambda: QdrantClient(
+            host=self.config['memory']['qdrant_host'],
+            port=self.config['memory']['qdrant_port']
+        ))
+
+    @property
+    def aredis(self):
+        return self._once("aredis", lambda: aioredis.Redis(
+            host=self.config['memory']['redis_host'],
+            port=self.config['memory']['redis_port'],
+            decode_responses=True
+        ))
+
+    @property
+    def aredis_bytes(self):
+        """Async client that leaves values as bytes, for binary payloads (msgpack chat turns)."""
+        return self._once("aredis_bytes", lambda: aioredis.Redis(
+            host=self.config['memory']['redis_host'],
+            port=self.config['memory']['redis_port']
+        ))
+
+    @property
+    def sessions(self):
+        def build():
+            from src.memory.session_store import SessionStore
+            settings = self.config.get('sessions', {})
+            return SessionStore(
+                ttl=settings.get('ttl', 604800),
+                window=settings.get('window', 6),
+                max_turns=settings.get('max_turns', 10),
+                summarize_after=settings.get('summarize_after', 20)
+            )
+        return self._once("sessions", build)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled keep-alive HTTP client for plain fetches (crawled pages, conditional GETs, sitemaps, ...)."""
+        return self._once("http", lambda: httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,  # httpx[http2]
+            headers={"User-Agent": self.config.get('crawler', {}).get('user_agent', "Mozilla/5.0 (compatible; CompanyResearcher/1.0)")},
+            follow_redirects=True,
+            timeout=httpx.Timeout(15, connect=5),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        ))
+
+    @property
+    def search_http(self) -> httpx.AsyncClient:
+        """Pooled client for search APIs, with strict timeouts so a stalled provider fails over instead of hanging."""
+        timeout = self.config['tools'].get('search_timeout', 8)
+        return self._once("search_http", lambda: httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(timeout, connect=min(3, timeout)),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        ))
+
+    @property
+    def search(self):
+        def build():
+            from src.agents.common.search_providers import SearchService, build_providers, get_rate_limiter
+            settings = self.config['tools']
+            hedging = settings.get('hedging', {})
+            return SearchService(
+                build_providers(settings.get('search_providers', {}), self.search_http),
+                timeout=settings.get('search_timeout', 8),
+                hedge=hedging.get('enabled', True),
+                quantile=hedging.get('quantile', 0.9),
+                min_samples=hedging.get('min_samples', 20),
+                default_delay=hedging.get('default_delay', 2.0),
+                rate_limiter=get_rate_limiter
+            )
+        return self._once("search", build)
+
+    @property
+    def embedder(self):
+        def build():
+            from fastembed import TextEmbedding
+            from src.memory.vectors import DENSE_MODEL
+            logger.info(f"Loading embedding model {DENSE_MODEL}")
+            return TextEmbedding(model_name=DENSE_MODEL)
+        return self._once("embedder", build)
+
+    @property
+    def sparse_embedder(self):
+        def build():
+            from fastembed import SparseTextEmbedding
+            from src.memory.vectors import SPARSE_MODEL
+            logger.info(f"Loading sparse model {SPARSE_MODEL}")
+            return SparseTextEmbedding(model_name=SPARSE_MODEL)
+        return self._once("sparse_embedder", build)
+
+    @property
+    def reranker(self):
+        def build():
+            from fastembed.rerank.cross_encoder import TextCrossEncoder
+            from src.memory.vectors import RERANK_MODEL
+            logger.info(f"Loading rerank model {RERANK_MODEL}")
+            return TextCrossEncoder(model_name=RERANK_MODEL)
+        return self._once("reranker", build)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker threads for CPU-bound work (ONNX embedding releases the GIL)."""
+        return self._once("executor", lambda: ThreadPoolExecutor(
+            max_workers=self.config.get('ingestion', {}).get('embed_threads', 2),
+            thread_name_prefix="embed"
+        ))
+
+    @property
+    def embeddings(self):
+        """Micro-batched, query-memoized embedding on the executor threads; the async path to the embedders."""
+        def build():
+            from src.memory.embedding_service import EmbeddingService
+            settings = self.config.get('embedding', {})
+            return EmbeddingService(
+                hybrid=self.config.get('retrieval', {}).get('mode', 'hybrid') == 'hybrid',
+                window=settings.get('batch_window_ms', 5) / 1000,
+                max_batch=settings.get('max_batch', 64),
+                cache_size=settings.get('query_cache_size', 4096)
+            )
+        return self._once("embeddings", build)
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for pure-Python CPU work that would otherwise hold the GIL (HTML cleaning)."""
+        return self._once("process_pool", lambda: ProcessPoolExecutor(
+            max_workers=self.config.get('crawler', {}).get('parse_processes') or min(4, os.cpu_count() or 1)
+        ))
+
+    @property
+    def jobs(self):
+        def build():
+            from src.jobs.queue import MemoryJobQueue, RedisJobQueue
+            settings = self.config.get('jobs', {})
+            if settings.get('backend', 'redis') == 'memory': return MemoryJobQueue()
+            return RedisJobQueue(self.aredis, job_ttl=settings.get('job_ttl', 604800), worker_ttl=settings.get('worker_ttl', 30))
+        return self._once("jobs", build)
+
+    @property
+    def llm(self):
+        def build():
+            from src.utils.llm_client import LLMClient
+            return LLMClient()
+        return self._once("llm", build)
+
+    @property
+    def search_cache(self):
+        def build():
+            from src.memory.search_cache import SearchCache
+            settings = self.config.get('cache', {}).get('search', {})
+            return SearchCache(
+                ttl=settings.get('ttl', 86400),
+                max_entries=settings.get('max_entries', 2048),
+                redis_client=self.aredis if settings.get('redis', True) else None
+            )
+        return self._once("search_cache", build)
+
+    @property
+    def browser_pool(self):
+        def build():
+            from src.agents.common.browser_pool import BrowserPool
+            settings = self.config.get('crawler', {})
+            return BrowserPool(
+                size=settings.get('browser_contexts', 5),
+                max_pages_per_context=settings.get('max_pages_per_context', 50)
+            )
+        return self._once("browser_pool", build)
+
+    async def aclose(self):
+        """Release everything that holds sockets or processes; called from the app lifespan."""
+        built = self._instances
+        if "browser_pool" in built: await built["browser_pool"].stop()
+        if "http" in built: await built["http"].aclose()
+        if "search_http" in built: await built["search_http"].aclose()
+        if "sessions" in built: await built["sessions"].aclose()
+        if "aredis" in built: await built["aredis"].aclose()
+        if "aredis_bytes" in built: await built["aredis_bytes"].aclose()
+        if "executor" in built: built["executor"].shutdown(wait=False, cancel_futures=True)
+        if "process_pool" in built: built["process_pool"].shutdown(wait=False, cancel_futures=True)
+        if "llm" in built:
+            from src.utils.llm_client import close_backend
+            await close_backend()
+
+    def stats(self) -> dict:
+        """Pool and cache statistics for whatever has been initialised so far."""
+        built = self._instances
+        out = {"initialised": sorted(built)}
+        if "llm" in built:
+            from src.utils.llm_client import get_slot_stats
+            out["llm"] = get_slot_stats()
+        if "embeddings" in built:
+            out["embeddings"] = built["embeddings"].get_stats()
+        if "search" in built:
+            out["search"] = built["search"].get_stats()
+        if "search_cache" in built:
+            out["search_cache"] = built["search_cache"].get_stats()
+        if "browser_pool" in built:
+            out["browser_pool"] = built["browser_pool"].get_stats()
+        return out
+
+_container = None
+_container_lock = threading.Lock()
+
+def get_container() -> Container:
+    global _container
+    with _container_lock:
+        if _container is None: _container = Container()
+        return _container
@@ -0,0 +1,142 @@
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from src.utils.chunker import count_tokens, truncate_tokens
+from src.utils.utils import load_config
+from src.utils.tracing import current_span
+
+config = load_config()
+
+# Evidence is built as "[Internal Report]: ..." / "[Web - <title>]: ..." entries joined by newlines; chunk text may itself span lines
+ITEM_START = re.compile(r"\n(?=\[[^\]\n]{1,200}\]: )")
+WORD = re.compile(r"\w+")
+STOPWORDS = frozenset("a an and are as at be by do does for from has have how in is it its of on or that the their they this to was were what when where which who why will with".split())
+SEPARATOR = "\n"
+
+def split_items(evidence: str) -> list:
+    """Individual evidence entries; falls back to blank-line paragraphs for free text."""
+    items = ITEM_START.split(evidence.strip())
+    if len(items) == 1: items = re.split(r"\n\s*\n", evidence.strip())
+    return [i.strip() for i in items if i.strip()]
+
+def _terms(text):
+    return [w for w in WORD.findall(text.lower()) if w not in STOPWORDS]
+
+def _shingles(terms, n=3):
+    return {tuple(terms[i:i + n]) for i in range(max(1, len(terms) - n + 1))}
+
+@dataclass
+class ContextPack:
+    text: str
+    tokens: int
+    budget: int
+    kept: int
+    dropped: list = field(default_factory=list)  # {"reason", "tokens", "preview"}
+
+    def report(self) -> dict:
+        return {
+            "budget": self.budget, "tokens": self.tokens, "kept": self.kept,
+            "dropped": len(self.dropped), "dropped_tokens": sum(d["tokens"] for d in self.dropped),
+            "dropped_items": self.dropped[:20]
+        }
+
+class ContextAssembler:
+    """Packs evidence into a token budget: split into entries, drop duplicates and near-duplicates
+    (overlapping chunks, the same snippet from two searches), rank by BM25 relevance to the query,
+    then take entries best-first until the budget is spent.
+
+    Ranking only decides what is dropped: kept entries go out in their original order. Entries are packed
+    whole; only an entry that alone exceeds the budget is cut.
+    """
+    def __init__(self, budget: int, duplicate_overlap: float = 0.8):
+        self.budget = budget
+        self.duplicate_overlap = duplicate_overlap
+
+    def _dedupe(self, items):
+        kept, dropped, seen = [], [], []
+        for text in items:
+            shingles = _shingles(_terms(text))
+            # Containment rather than Jaccard: a short snippet inside a longer chunk is still a duplicate
+            if any(len(shingles & other) / len(shingles) >= self.duplicate_overlap for other in seen if shingles):
+                dropped.append(text)
+                continue
+            seen.append(shingles)
+            kept.append(text)
+        return kept, dropped
+
+    @staticmethod
+    def _rank(items, query, texts=None, k1=1.2, b=0.75):
+        """`items` best-first by BM25 of `texts` (default: the items themselves) against `query`."""
+        texts = texts if texts is not None else items
+        terms = set(_terms(query or ""))
+        if not terms or not items: return items
+        docs = [Counter(_terms(t)) for t in texts]
+        avg = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+        df = Counter(t for d in docs for t in terms if t in d)
+        def score(d):
+            length = sum(d.values())
+            return sum(
+                math.log(1 + (len(docs) - df[t] + 0.5) / (df[t] + 0.5)) * d[t] * (k1 + 1) / (d[t] + k1 * (1 - b + b * length / avg))
+                for t in terms if t in d
+            )
+        # Stable sort: ties keep their retrieval order
+        return [items[i] for i in sorted(range(len(items)), key=lambda i: -score(docs[i]))]
+
+    def pack(self, evidence: str, query: str = None) -> ContextPack:
+        items, duplicates = self._dedupe(split_items(evidence or ""))
+        dropped = [self._drop(t, "duplicate") for t in duplicates]
+        chosen, used = {}, 0  # original index -> text
+        for i in self._rank(list(range(len(items))), query, items):
+            text = items[i]
+            cost = count_tokens(text) + (1 if chosen else 0)
+            if used + cost <= self.budget:
+                chosen[i] = text
+                used += cost
+            elif not chosen and self.budget > 0:
+                # The most relevant entry alone is over budget: keep its head rather than nothing
+                chosen[i] = truncate_tokens(text, self.budget)
+                used = count_tokens(chosen[i])
+                dropped.append(self._drop(text, "truncated", cost - used))
+            else:
+                dropped.append(self._drop(text, "budget", cost))
+        return ContextPack(SEPARATOR.join(chosen[i] for i in sorted(chosen)), used, self.budget, len(chosen), dropped)
+
+    @staticmethod
+    def _drop(text, reason, tokens=None):
+        return {"reason": reason, "tokens": tokens if tokens is not None else count_tokens(text), "preview": text[:80]}
+
+def pack_context(agent: str, evidence: str, query: str = None, wn=None) -> str:
+    """Evidence packed to `context.budgets[agent]` tokens; the pack report lands on the current span (the agent's)."""
+    settings = config.get('context', {})
+    budget = settings.get('budgets', {}).get(agent)
+    if not budget or not evidence: return evidence
+    pack = ContextAssembler(budget, settings.get('duplicate_overlap', 0.8)).pack(evidence, query)
+    s = current_span()
+    if s is not None: s.set(context=pack.report())
+    if pack.dropped and wn is not None:
+        wn.add_note("Context", f"{agent}: kept {pack.kept} entries ({pack.tokens}/{budget} tokens), dropped {len(pack.dropped)}")
+    return pack.text
+
+def pack_history(agent: str, header: str, turns: list, wn=None) -> str:
+    """Conversation history packed to `context.budgets[agent]` tokens as one unit: `header` then the newest
+    `turns` that fit, in order. Never split or reranked; the oldest turns are dropped first."""
+    budget = config.get('context', {}).get('budgets', {}).get(agent)
+    text = SEPARATOR.join([header, *turns])
+    if not budget or count_tokens(text) <= budget: return text
+    header = truncate_tokens(header, budget)
+    kept, used = [], count_tokens(header)
+    for turn in reversed(turns):
+        cost = count_tokens(turn) + 1
+        if used + cost > budget: break
+        kept.insert(0, turn)
+        used += cost
+    if not kept and turns and budget - used > 1:
+        # The latest turn alone is over budget: keep its head rather than lose the conversation
+        kept = [truncate_tokens(turns[-1], budget - used - 1)]
+        used += count_tokens(kept[0]) + 1
+    s = current_span()
+    if s is not None: s.set(context={"budget": budget, "tokens": used, "kept": len(kept), "dropped": len(turns) - len(kept)})
+    if wn is not None:
+        wn.add_note("Context", f"{agent}: kept the latest {len(kept)} of {len(turns)} turns ({used}/{budget} tokens)")
+    return SEPARATOR.join([header, *kept])
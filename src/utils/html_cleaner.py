@@ -0,0 +1,142 @@
+import re
+from urllib.parse import urljoin
+from lxml import etree, html as lxml_html
+
+# Same rules the crawler has always applied, compiled once per process
+DROP_TAGS = ("nav", "footer", "header", "aside", "script", "style", "svg", "form", "noscript", "iframe", "template")
+NOISE = re.compile(r"menu|navigation|nav-|sidebar|footer|cookie|banner|popup", re.I)
+NOISE_CANDIDATES = etree.XPath("//div[@class or @id] | //section[@class or @id] | //ul[@class or @id]")
+HREFS = etree.XPath("//a/@href")
+XML_DECL = re.compile(r"^\s*<\?xml[^>]*\?>")
+SPACE = re.compile(r"\s+")
+BR = "\x00"  # survives whitespace collapsing, becomes a newline at the end
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+BLOCKS = {
+    "p", "div", "section", "article", "main", "body", "ul", "ol", "li", "pre", "blockquote", "table",
+    "hr", "dl", "dt", "dd", "figure", "figcaption", "details", "summary", "address", "center", *HEADINGS
+}
+PARSER = lxml_html.HTMLParser(remove_comments=True, remove_pis=True)
+
+def _clean(text: str) -> str:
+    return "\n".join(line.strip() for line in SPACE.sub(" ", text).replace(BR, "\n").split("\n")).strip()
+
+class _Renderer:
+    """Walks an lxml tree once and emits markdown blocks (headings, paragraphs, lists, tables, code, quotes)."""
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def inline(self, el) -> str:
+        out = el.text or ""
+        for child in el:
+            if isinstance(child.tag, str): out += self._inline_el(child)
+            out += child.tail or ""
+        return out
+
+    def _inline_el(self, el) -> str:
+        tag = el.tag
+        if tag == "br": return BR
+        if tag == "img": return el.get("alt", "")
+        text = self.inline(el)
+        if tag == "a":
+            href, label = el.get("href", ""), text.strip()
+            if label and href and not href.startswith(("#", "javascript:", "mailto:")):
+                return f"[{label}]({urljoin(self.base_url, href)})"
+            return text
+        if tag in ("strong", "b") and text.strip(): return f"**{text.strip()}**"
+        if tag in ("em", "i") and text.strip(): return f"*{text.strip()}*"
+        if tag == "code" and text.strip(): return f"`{text.strip()}`"
+        return f" {text} " if tag in BLOCKS else text
+
+    def blocks(self, el, out: list):
+        """Container: runs of inline content become paragraphs, block children render themselves."""
+        buf = el.text or ""
+        for child in el:
+            if not isinstance(child.tag, str):
+                buf += child.tail or ""
+                continue
+            if child.tag in BLOCKS:
+                self._flush(buf, out)
+                self.block(child, out)
+                buf = child.tail or ""
+            else:
+                buf += self._inline_el(child) + (child.tail or "")
+        self._flush(buf, out)
+
+    @staticmethod
+    def _flush(buf, out):
+        text = _clean(buf)
+        if text: out.append(text)
+
+    def block(self, el, out: list):
+        tag = el.tag
+        if tag in HEADINGS:
+            text = _clean(self.inline(el)).replace("\n", " ")
+            if text: out.append("#" * HEADINGS[tag] + " " + text)
+        elif tag in ("ul", "ol"):
+            lines = self.list_lines(el, 0)
+            if lines: out.append("\n".join(lines))
+        elif tag == "pre":
+            code = el.text_content().strip("\n")
+            if code.strip(): out.append(f"```\n{code}\n```")
+        elif tag == "table":
+            table = self.table(el)
+            if table: out.append(table)
+        elif tag == "blockquote":
+            inner = []
+            self.blocks(el, inner)
+            if inner: out.append("\n".join("> " + line for line in "\n\n".join(inner).split("\n")))
+        elif tag == "hr": out.append("---")
+        else: self.blocks(el, out)
+
+    def list_lines(self, el, depth: int) -> list:
+        lines, n = [], 0
+        for li in el:
+            if li.tag != "li": continue
+            n += 1
+            text, nested = li.text or "", []
+            for child in li:
+                if not isinstance(child.tag, str): text += child.tail or ""
+                elif child.tag in ("ul", "ol"):
+                    nested += self.list_lines(child, depth + 1)
+                    text += child.tail or ""
+                else: text += self._inline_el(child) + (child.tail or "")
+            text = _clean(text).replace("\n", " ")
+            marker = f"{n}." if el.tag == "ol" else "-"
+            if text: lines.append(f"{'  ' * depth}{marker} {text}")
+            lines += nested
+        return lines
+
+    def table(self, el) -> str:
+        rows = []
+        for tr in el.iter("tr"):
+            cells = [_clean(self.inline(c)).replace("\n", " ").replace("|", "\\|") for c in tr if c.tag in ("td", "th")]
+            if any(cells): rows.append(cells)
+        if not rows: return ""
+        width = max(len(r) for r in rows)
+        rows = [r + [""] * (width - len(r)) for r in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+        lines += ["| " + " | ".join(r) + " |" for r in rows[1:]]
+        return "\n".join(lines)
+
+def html_to_markdown(raw_html: str, base_url: str = ""):
+    """Single lxml parse -> (title, absolute links, cleaned markdown).
+
+    Links are taken before cleaning so navigation still feeds the crawl frontier. Module-level
+    and picklable so the crawler can run it in a process pool.
+    """
+    try:
+        root = lxml_html.document_fromstring(XML_DECL.sub("", raw_html, count=1), parser=PARSER)
+    except (etree.ParserError, ValueError):
+        return "", [], ""
+    title = SPACE.sub(" ", root.findtext(".//title") or "").strip()
+    links = list({urljoin(base_url, h.strip()) for h in HREFS(root)})
+
+    for el in list(root.iter(*DROP_TAGS)): el.drop_tree()
+    for el in NOISE_CANDIDATES(root):
+        if NOISE.search(el.get("class", "")) or NOISE.search(el.get("id", "")): el.drop_tree()
+
+    body = root.find("body")
+    out = []
+    _Renderer(base_url).blocks(body if body is not None else root, out)
+    return title, links, "\n\n".join(out)
@@ -1,27 +1,181 @@
-from openai import OpenAI
+import asyncio
 import os
 import json
+import httpx
+from contextlib import asynccontextmanager
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from dotenv import load_dotenv
+from config.logger_config import get_logger
 from src.utils.utils import load_config
+from src.utils.chunker import count_tokens
+from src.utils.tracing import span, record_tokens
 
 load_dotenv()
 config = load_config()
+logger = get_logger("llm")
+
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+# One canned payload that satisfies every json_mode prompt in prompts.yaml
+STUB_JSON = {
+    "decision": "RECALL",
+    "thought": "Offline stub.",
+    "finance": ["revenue estimate", "funding history", "run rate"],
+    "marketing": ["target audience", "competitors", "pricing"],
+    "sufficient": True,
+    "feedback": "",
+    "final_answer": "Offline stub answer.",
+}
+
+class StubBackend:
+    """Offline backend with a fixed latency, used to load-test agents without the network."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def complete(self, model, messages, json_mode, temperature):
+        await asyncio.sleep(self.latency)
+        user = messages[-1]["content"]
+        if json_mode:
+            content = json.dumps({**STUB_JSON, "query": user, "sub_queries": [user], "refined_queries": [user]})
+        else:
+            content = f"Offline stub response to: {user}"
+        record_tokens(sum(count_tokens(m["content"]) for m in messages), count_tokens(content), estimated=True)
+        return content
+
+    async def stream(self, model, messages, json_mode, temperature):
+        content = await self.complete(model, messages, json_mode, temperature)
+        for i in range(0, len(content), 8):
+            await asyncio.sleep(0)
+            yield content[i:i+8]
+
+    async def aclose(self): pass
+
+class OpenAIBackend:
+    """AsyncOpenAI over a single pooled httpx client shared by every agent."""
+    def __init__(self, settings: dict):
+        max_conn = settings.get("max_concurrency", 16)
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_conn),
+            timeout=httpx.Timeout(settings.get("timeout", 60), connect=10),
+        )
+        # Retries are owned by LLMClient so they respect the global semaphore
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self.http, max_retries=0)
+
+    async def complete(self, model, messages, json_mode, temperature):
+        res = await self.client.chat.completions.create(
+            model=model,
+            response_format={"type": "json_object"} if json_mode else {"type": "text"},
+            messages=messages,
+            temperature=temperature
+        )
+        if res.usage: record_tokens(res.usage.prompt_tokens, res.usage.completion_tokens)
+        return res.choices[0].message.content
+
+    async def stream(self, model, messages, json_mode, temperature):
+        stream = await self.client.chat.completions.create(
+            model=model,
+            response_format={"type": "json_object"} if json_mode else {"type": "text"},
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for part in stream:
+            if part.usage: record_tokens(part.usage.prompt_tokens, part.usage.completion_tokens)
+            if part.choices and part.choices[0].delta.content:
+                yield part.choices[0].delta.content
+
+    async def aclose(self): await self.http.aclose()
+
+_backend = None
+_semaphore = None
+_slots = {"waiting": 0, "in_flight": 0, "requests": 0}
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        settings = config['llm']
+        name = os.getenv("LLM_BACKEND") or settings.get("backend", "openai")
+        if name == "stub":
+            logger.info("Using offline stub LLM backend.")
+            _backend = StubBackend(settings.get("stub_latency", 0.0))
+        else:
+            _backend = OpenAIBackend(settings)
+    return _backend
+
+def get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(config['llm'].get("max_concurrency", 16))
+    return _semaphore
+
+@asynccontextmanager
+async def llm_slot():
+    """One of llm.max_concurrency request slots, counted for /stats."""
+    _slots["waiting"] += 1
+    try:
+        await get_semaphore().acquire()
+    finally:
+        _slots["waiting"] -= 1
+    _slots["in_flight"] += 1
+    _slots["requests"] += 1
+    try:
+        yield
+    finally:
+        _slots["in_flight"] -= 1
+        get_semaphore().release()
+
+def get_slot_stats() -> dict:
+    return {"max_concurrency": config['llm'].get("max_concurrency", 16), **_slots}
+
+async def close_backend():
+    global _backend
+    if _backend is not None:
+        await _backend.aclose()
+        _backend = None
 
 class LLMClient:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.backend = get_backend()
         # Force the model from config
         self.model = config['llm']['model_id']
+        self.max_retries = config['llm'].get("max_retries", 3)
+
+    async def _complete(self, messages, json_mode):
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=wait_random_exponential(multiplier=0.5, max=8),
+            reraise=True,
+        ):
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    logger.warning(f"LLM retry #{attempt.retry_state.attempt_number - 1}")
+                # Hold a slot only while the request is in flight, not during backoff
+                async with llm_slot():
+                    return await self.backend.complete(self.model, messages, json_mode, config['llm']['temperature'])
+
+    async def chat(self, sys_prompt, user_content, json_mode=False):
+        with span("llm.chat", model=self.model, json_mode=json_mode) as s:
+            try:
+                messages = [{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_content}]
+                content = await self._complete(messages, json_mode)
+                s.set(bytes=len(content.encode("utf-8")))
+                return json.loads(content) if json_mode else content
+            except Exception as e:
+                s.set(error=f"{type(e).__name__}: {e}"[:200])
+                return {} if json_mode else f"Error: {e}"
 
-    def chat(self, sys_prompt, user_content, json_mode=False):
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                response_format={"type": "json_object"} if json_mode else {"type": "text"},
-                messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_content}],
-                temperature=config['llm']['temperature']
-            )
-            content = res.choices[0].message.content
-            return json.loads(content) if json_mode else content
-        except Exception as e:
-            return {} if json_mode else f"Error: {e}"
\ No newline at end of file
+    async def stream(self, sys_prompt, user_content, json_mode=False):
+        """Yields content deltas as they arrive. Not retried: a partial answer may already be on the wire."""
+        messages = [{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_content}]
+        with span("llm.stream", model=self.model, json_mode=json_mode) as s:
+            try:
+                async with llm_slot():
+                    async for delta in self.backend.stream(self.model, messages, json_mode, config['llm']['temperature']):
+                        s.add(bytes=len(delta.encode("utf-8")))
+                        yield delta
+            except Exception as e:
+                s.set(error=f"{type(e).__name__}: {e}"[:200])
+                logger.error(f"LLM stream failed: {e}")
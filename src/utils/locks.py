@@ -0,0 +1,21 @@
+import uuid
+from redis.exceptions import WatchError
+
+async def acquire_lock(redis, key: str, ttl: int):
+    """Token if this caller now holds `key` (for at most `ttl` seconds), else None."""
+    token = uuid.uuid4().hex
+    return token if await redis.set(key, token, nx=True, ex=ttl) else None
+
+async def release_lock(redis, key: str, token: str):
+    """Deletes `key` only while it still holds our token: an expired lock may already belong to someone else."""
+    async with redis.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(key)
+            held = await pipe.get(key)
+            if isinstance(held, bytes): held = held.decode()
+            if held != token: return
+            pipe.multi()
+            pipe.delete(key)
+            await pipe.execute()
+        except WatchError:
+            pass  # changed under us, so it was no longer ours
@@ -0,0 +1,57 @@
+import time
+import random
+import asyncio
+from config.logger_config import get_logger
+from src.utils.redis_backoff import RedisBackoff
+
+logger = get_logger("rate_limiter")
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second, bursting up to `burst`."""
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RedisRateLimiter:
+    """Rate limit shared by every process using the same Redis: at most `rate` acquisitions per second
+    for `name`, counted in fixed windows (INCR + EXPIRE in one round-trip). Falls back to a process-local
+    RateLimiter while Redis is unreachable."""
+    def __init__(self, redis, name: str, rate: float):
+        self._redis = RedisBackoff(redis, f"the {name} rate limit")
+        self.key = f"ratelimit:{name}"
+        self.window = max(1.0, 1.0 / rate)  # slow rates get longer windows holding one call
+        self.limit = max(1, round(rate * self.window))
+        self.local = RateLimiter(rate)
+
+    async def acquire(self):
+        while (redis := self._redis.client) is not None:
+            now = time.time()
+            slot = int(now // self.window)
+            key = f"{self.key}:{slot}"
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.incr(key)
+                    pipe.expire(key, int(self.window) + 1)
+                    count, _ = await pipe.execute()
+            except Exception as e:
+                self._redis.failed(e)
+                break
+            if count <= self.limit: return
+            # Jitter so waiters don't all hit Redis at the window boundary
+            await asyncio.sleep((slot + 1) * self.window - now + random.uniform(0, 0.05))
+        await self.local.acquire()
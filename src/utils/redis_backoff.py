@@ -0,0 +1,31 @@
+import time
+from src.utils.utils import load_config
+from config.logger_config import get_logger
+
+logger = get_logger("redis")
+config = load_config()
+
+class RedisBackoff:
+    """Optional Redis client that is skipped for `retry_after` seconds after an error, then tried again.
+
+    Callers use `.client` (None while backing off) and report errors to `failed()`; the first failure of an
+    outage is logged, the rest only push the retry time out.
+    """
+    def __init__(self, client, what: str, retry_after: float = None):
+        self._client = client
+        self.what = what
+        self.retry_after = retry_after if retry_after is not None else config['memory'].get('redis_retry_after', 30)
+        self.down_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None or time.monotonic() < self.down_until: return None
+        if self.down_until:
+            logger.info(f"🔁 Retrying Redis for {self.what}")
+            self.down_until = 0.0
+        return self._client
+
+    def failed(self, e):
+        if not self.down_until:
+            logger.warning(f"⚠️ Redis unavailable for {self.what}, retrying in {self.retry_after:g}s: {e}")
+        self.down_until = time.monotonic() + self.retry_after
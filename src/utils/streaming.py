@@ -0,0 +1,88 @@
+import re
+import json
+import asyncio
+from config.logger_config import WorkNotesManager, get_logger
+
+logger = get_logger("streaming")
+
+_DONE = object()
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+class JsonFieldStreamer:
+    """Incrementally decodes one string field out of a JSON object that is still being streamed,
+    so json_mode answers can be forwarded token by token."""
+    def __init__(self, field: str):
+        self.marker = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.buffer = ""
+        self.value = ""
+        self.done = False
+        self._pos = None
+
+    def feed(self, delta: str) -> str:
+        self.buffer += delta
+        if self.done: return ""
+        if self._pos is None:
+            m = self.marker.search(self.buffer)
+            if not m: return ""
+            self._pos = m.end()
+        buf, i, out = self.buffer, self._pos, []
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            if c == "\\":
+                if i + 1 >= len(buf): break  # escape split across deltas
+                esc = buf[i + 1]
+                if esc == "u":
+                    if i + 6 > len(buf): break
+                    code = int(buf[i + 2:i + 6], 16)
+                    if 0xD800 <= code < 0xDC00:
+                        # High surrogate: wait for the low half so astral characters (emoji) decode as one
+                        if i + 12 > len(buf) and buf[i + 6:i + 8] in ("\\u", "\\", ""): break
+                        low = int(buf[i + 8:i + 12], 16) if buf[i + 6:i + 8] == "\\u" else 0
+                        if 0xDC00 <= low < 0xE000:
+                            out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                            i += 12
+                            continue
+                    out.append(chr(code))
+                    i += 6
+                    continue
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            out.append(c)
+            i += 1
+        self._pos = i
+        text = "".join(out)
+        self.value += text
+        return text
+
+    def result(self) -> dict:
+        try: return json.loads(self.buffer)
+        except Exception: return {}
+
+async def stream_events(run):
+    """Runs `run(wn)` in a task and yields its work notes/events as they are emitted, then a final
+    `result` (or `error`) event. Cancelling the consumer (client disconnect) cancels the run."""
+    queue = asyncio.Queue()
+    task = asyncio.create_task(run(WorkNotesManager(sink=queue)))
+    task.add_done_callback(lambda _: queue.put_nowait(_DONE))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE: break
+            yield item
+        if task.cancelled(): return
+        if task.exception():
+            logger.error(f"Streamed run failed: {task.exception()}")
+            yield {"event": "error", "detail": str(task.exception())}
+        else:
+            yield {"event": "result", **task.result()}
+    finally:
+        if not task.done(): task.cancel()
+
+async def ndjson(events):
+    async for event in events:
+        yield json.dumps(event, default=str) + "\n"
@@ -0,0 +1,103 @@
+import time
+import functools
+import contextvars
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+except ImportError:  # spans still land in the response trace; /metrics just has nothing to export
+    Counter = Histogram = None
+
+_current = contextvars.ContextVar("span", default=None)
+
+if Histogram:
+    SPAN_SECONDS = Histogram(
+        "span_duration_seconds", "Duration of traced pipeline stages, agent calls, LLM and tool calls",
+        ["span", "status"], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+    )
+    SPAN_BYTES = Histogram(
+        "span_payload_bytes", "Size of what a traced call fetched or returned",
+        ["span"], buckets=(100, 1e3, 1e4, 1e5, 1e6, 1e7)
+    )
+    LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by calling agent", ["agent", "kind"])
+    CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+
+class Span:
+    """One timed operation. Children are the spans opened while it was current, in this task or tasks it spawned."""
+    __slots__ = ("name", "attrs", "parent", "children", "start", "duration")
+
+    def __init__(self, name, attrs, parent=None):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self.start = time.perf_counter()
+        self.duration = None
+        if parent is not None: parent.children.append(self)
+
+    def set(self, **attrs): self.attrs.update(attrs)
+
+    def add(self, **counts):
+        for k, v in counts.items(): self.attrs[k] = self.attrs.get(k, 0) + v
+
+    def agent(self) -> str:
+        s = self
+        while s is not None and not s.name.startswith("agent."): s = s.parent
+        return s.name.removeprefix("agent.") if s else "none"
+
+    def to_dict(self) -> dict:
+        out = {"name": self.name, "ms": round((self.duration if self.duration is not None else time.perf_counter() - self.start) * 1000, 1)}
+        if self.attrs: out["attrs"] = self.attrs
+        if self.children: out["children"] = [c.to_dict() for c in self.children]
+        return out
+
+def current_span():
+    return _current.get()
+
+@contextmanager
+def span(name: str, **attrs):
+    s = Span(name, attrs, _current.get())
+    token = _current.set(s)
+    status = "ok"
+    try:
+        yield s
+    except BaseException as e:
+        status = "cancelled" if type(e).__name__ == "CancelledError" else "error"
+        s.attrs["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        s.duration = time.perf_counter() - s.start
+        try: _current.reset(token)
+        except ValueError: pass  # closed from another context (e.g. an abandoned async generator)
+        if Histogram:
+            SPAN_SECONDS.labels(name, status).observe(s.duration)
+            if "bytes" in s.attrs: SPAN_BYTES.labels(name).observe(s.attrs["bytes"])
+
+def traced(name: str):
+    """Decorator for async agent methods: the whole call becomes one span."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        async def inner(*args, **kwargs):
+            with span(name): return await fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def record_tokens(prompt: int, completion: int, estimated: bool = False):
+    s = _current.get()
+    if s is None: return
+    s.add(prompt_tokens=prompt, completion_tokens=completion)
+    if estimated: s.set(tokens_estimated=True)
+    if Counter:
+        agent = s.agent()
+        LLM_TOKENS.labels(agent, "prompt").inc(prompt)
+        LLM_TOKENS.labels(agent, "completion").inc(completion)
+
+def record_cache(cache: str, hit: bool):
+    s = _current.get()
+    if s is not None: s.set(**{f"{cache}_cache_hit": hit})
+    if Counter: CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+def metrics_payload():
+    """(body, content type) for the /metrics endpoint."""
+    if not Histogram: return b"# prometheus_client is not installed\n", "text/plain"
+    return generate_latest(), CONTENT_TYPE_LATEST
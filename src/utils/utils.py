@@ -1,12 +1,28 @@
 import yaml
 import re
+import uuid
+import hashlib
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def load_prompts():
     with open("config/prompts.yaml", "r") as f: return yaml.safe_load(f)
 
+@lru_cache(maxsize=None)
+def load_routes():
+    with open("config/routes.yaml", "r") as f: return yaml.safe_load(f)
+
+@lru_cache(maxsize=None)
 def load_config():
     with open("config/config.yaml", "r") as f: return yaml.safe_load(f)
 
 def sanitize_url(url: str):
     clean = url.replace("https://", "").replace("http://", "").replace("www.", "")
-    return re.sub(r'[^a-zA-Z0-9]', '_', clean)[:63]
\ No newline at end of file
+    return re.sub(r'[^a-zA-Z0-9]', '_', clean)[:63]
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def chunk_id(source: str, text: str) -> str:
+    """Deterministic point ID: re-ingesting the same chunk from the same source overwrites instead of duplicating."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{content_hash(text)}"))
\ No newline at end of file
@@ -0,0 +1,49 @@
+import asyncio
+from src.jobs.queue import MemoryJobQueue
+from src.jobs.worker import CrawlWorker
+
+class SleepingCrawler:
+    """Stands in for CrawlerAgent: a crawl that only ends when cancelled."""
+    def __init__(self): self.task = None
+
+    async def deep_crawl(self, url, job_id, progress=None):
+        self.task = asyncio.current_task()
+        await asyncio.sleep(3600)
+
+async def _start(jobs):
+    worker = CrawlWorker(jobs, poll_interval=0.05)
+    worker._crawler = SleepingCrawler()
+    task = asyncio.create_task(worker.run())
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if (await jobs.get("j1"))["status"] == "running": break
+    return worker, task
+
+def test_shutdown_hands_running_job_back():
+    async def scenario():
+        jobs = MemoryJobQueue()
+        await jobs.enqueue("j1", "https://example.com")
+        worker, task = await _start(jobs)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert (await jobs.get("j1"))["status"] == "queued"
+        assert jobs.pending.qsize() == 1
+        assert worker.crawler.task.done()
+        assert jobs.domains["example.com"] == 0
+    asyncio.run(scenario())
+
+def test_requested_cancel_is_recorded():
+    async def scenario():
+        jobs = MemoryJobQueue()
+        await jobs.enqueue("j1", "https://example.com")
+        worker, task = await _start(jobs)
+        await jobs.cancel("j1")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if (await jobs.get("j1"))["status"] == "cancelled": break
+        assert (await jobs.get("j1"))["status"] == "cancelled"
+        assert worker.crawler.task.done()
+        assert jobs.pending.qsize() == 0
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    asyncio.run(scenario())